@@ -2,6 +2,10 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
+import io
+import hashlib
+import importlib.util
+import httpx
 from csv_processor import CSVProcessor
 from html_generator import HTMLGenerator
 from llm_helper import LLMHelper
@@ -32,11 +36,25 @@ def init_components(test_mode: bool = False):
     else:
         # Get API key from Streamlit secrets
         api_key = st.secrets.get("openai_api_key", None)
-        llm_helper = LLMHelper(api_key=api_key)
+        # One pooled async client so concurrent LLM calls reuse keep-alive connections
+        # (multiplexed over HTTP/2 when the optional h2 package is installed)
+        http_client = httpx.AsyncClient(
+            http2=importlib.util.find_spec('h2') is not None,
+            timeout=30,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=20)
+        )
+        llm_helper = LLMHelper(api_key=api_key, http_client=http_client)
     
     html_generator = HTMLGenerator(llm_helper=llm_helper)
     return csv_processor, url_generator, llm_helper, html_generator
 
+# Streamlit reruns the script on every interaction, so parse each uploaded file once
+@st.cache_data(show_spinner=False)
+def load_courses(_csv_processor: CSVProcessor, file_bytes: bytes):
+    """Process CSV bytes and summarise content types, cached by file content"""
+    courses_df = _csv_processor.process_csv(io.BytesIO(file_bytes))
+    return courses_df, _csv_processor.get_content_types(courses_df)
+
 def main():
     st.title("🎾 Vamos Tennis Newsletter Generator")
     st.markdown("Generate HTML newsletters to copy and paste into Postman")
@@ -80,18 +98,20 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
     )
     
     courses_df = None
+    csv_hash = None
     available_content_types = []
     
     if uploaded_file is not None:
         try:
             # Process CSV
-            courses_df = csv_processor.process_csv(uploaded_file)
+            file_bytes = uploaded_file.getvalue()
+            csv_hash = hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+            courses_df, content_types = load_courses(csv_processor, file_bytes)
             
             # Show summary
             st.success(f"✅ Processed {len(courses_df)} courses successfully!")
             
             # Show content types available
-            content_types = csv_processor.get_content_types(courses_df)
             available_content_types = [k for k, v in content_types.items() if v['available']]
             
             st.markdown("**Available content types:**")
@@ -157,6 +177,9 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
     
     if events:
         st.success(f"✅ Added {len(events)} events")
+
+    # Index events by id so ordered content can look them up directly
+    events_by_id = {event['id']: event for event in events}
     
     # Step 2: Content Order (show if courses or events are available)
     if courses_df is not None or events:
@@ -197,41 +220,36 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
             if updated_order != existing_order:
                 st.session_state.content_order = updated_order
         
-        # Display all content with reordering controls
-        st.markdown("**Drag and drop or use Move Up/Down to reorder content:**")
+        # Display all content with reordering controls. Positions are edited inside a form
+        # so reordering several items costs a single rerun when the form is submitted.
+        st.markdown("**Set the position of each item, then click Update Order:**")
         
-        # Create a copy of the order for manipulation
         current_order = st.session_state.content_order.copy()
 
-        for i, content_type in enumerate(current_order):
-            col1, col2, col3 = st.columns([0.1, 0.75, 0.15])
-
-            with col1:
-                st.write(f"{i+1}.")
-
-            with col2:
-                if content_type.startswith('event_'):
-                    event_title = "Event"
-                    for event in events:
-                        if event['id'] == content_type:
-                            event_title = event['title']
-                            break
-                    st.write(f"🏆 {event_title}")
-                else:
-                    st.write(f"🎾 {content_type.title()} Courses")
-
-            with col3:
-                if st.button("Move Up", key=f"up_{i}", disabled=(i==0)):
-                    if i > 0:
-                        current_order[i], current_order[i-1] = current_order[i-1], current_order[i]
-                        st.session_state.content_order = current_order
-                        st.rerun()
+        with st.form("content_order_form"):
+            for i, content_type in enumerate(current_order):
+                col1, col2 = st.columns([0.15, 0.85])
+
+                with col1:
+                    # Inputs are cleared on submit, so they always start from the current order
+                    st.number_input(
+                        f"Position of {content_type}",
+                        min_value=1,
+                        value=i + 1,
+                        step=1,
+                        key=f"position_{i}_{content_type}",
+                        label_visibility="collapsed"
+                    )
+
+                with col2:
+                    if content_type.startswith('event_'):
+                        event = events_by_id.get(content_type)
+                        event_title = event['title'] if event else "Event"
+                        st.write(f"🏆 {event_title}")
+                    else:
+                        st.write(f"🎾 {content_type.title()} Courses")
 
-                if st.button("Move Down", key=f"down_{i}", disabled=(i==len(current_order)-1)):
-                    if i < len(current_order) - 1:
-                        current_order[i], current_order[i+1] = current_order[i+1], current_order[i]
-                        st.session_state.content_order = current_order
-                        st.rerun()
+            st.form_submit_button("Update Order", on_click=apply_content_order, args=(current_order,))
         
         # Update content_order for use in generation
         content_order = st.session_state.content_order
@@ -242,24 +260,42 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
         if st.button("🎯 Generate Blurbs", type="primary"):
             with st.spinner("Generating blurbs..."):
                 captured_blurbs = {}
+                # Cached blurbs are reused on the first run; clicking again asks for fresh ones
+                refresh = st.session_state.get('blurbs_generated', False)
+
+                # Event and skill level descriptions are independent, so request them all
+                # concurrently rather than one round-trip at a time
+                ordered_events = [events_by_id[content_type] for content_type in content_order if content_type in events_by_id]
+                adult_levels = []
+                if 'adults' in content_order and courses_df is not None:
+                    adult_courses = courses_df[courses_df['_type_lc'] == 'adult']
+                    adult_levels = [level for level in adult_courses['Skill Level'].dropna().unique() if level != 'Unknown']
+
+                event_descriptions = {}
+                level_descriptions = {}
+                if (ordered_events or adult_levels) and llm_helper:
+                    try:
+                        results = llm_helper.run_concurrently(
+                            *[
+                                llm_helper.agenerate_event_description({'description': event.get('description', '')}, refresh=refresh)
+                                for event in ordered_events
+                            ],
+                            *[llm_helper.agenerate_level_description(level, refresh=refresh) for level in adult_levels]
+                        )
+                        event_descriptions = {event['id']: result for event, result in zip(ordered_events, results)}
+                        level_descriptions = dict(zip(adult_levels, results[len(ordered_events):]))
+                    except Exception:
+                        event_descriptions = {}
+                        level_descriptions = {}
+
                 for content_type in content_order:
                     if content_type.startswith('event_'):
-                        event = next((e for e in events if e['id'] == content_type), None)
-                        if event and llm_helper:
-                            try:
-                                captured_blurbs[content_type] = llm_helper.generate_event_description({'description': event.get('description', '')}) or ""
-                            except Exception:
-                                captured_blurbs[content_type] = ""
-                        elif event:
-                            captured_blurbs[content_type] = ""
-                    elif content_type == 'adults' and courses_df is not None and llm_helper:
-                        courses = courses_df[courses_df['Type'].str.lower() == 'adult']
-                        for skill_level in courses['Skill Level'].dropna().unique():
-                            if skill_level != 'Unknown':
-                                try:
-                                    captured_blurbs[f'adults_{skill_level}'] = llm_helper.generate_level_description(skill_level) or ""
-                                except Exception:
-                                    captured_blurbs[f'adults_{skill_level}'] = ""
+                        event = events_by_id.get(content_type)
+                        if event:
+                            captured_blurbs[content_type] = event_descriptions.get(content_type) or ""
+                    elif content_type == 'adults' and llm_helper:
+                        for skill_level in adult_levels:
+                            captured_blurbs[f'adults_{skill_level}'] = level_descriptions.get(skill_level) or ""
                 # Clear blurb widget state so text areas show fresh values
                 for k in list(st.session_state.keys()):
                     if k.startswith('blurb_'):
@@ -276,7 +312,7 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
             for content_type in content_order:
                 if content_type.startswith('event_'):
                     if content_type in blurbs:
-                        event = next((e for e in events if e['id'] == content_type), None)
+                        event = events_by_id.get(content_type)
                         label = event['title'] if event else content_type
                         st.text_area(f"📋 {label}", value=blurbs[content_type], key=f"blurb_{content_type}", height=100)
                 elif content_type == 'adults':
@@ -291,34 +327,23 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
 
             if st.button("🎯 Generate Newsletter HTML", type="primary"):
                 with st.spinner("Generating newsletter HTML..."):
-                    html_blocks = []
                     # Read current text area values (edited by user) from session state
                     blurbs = st.session_state.get('blurbs', {})
                     current_blurbs = {k: st.session_state.get(f'blurb_{k}', v) for k, v in blurbs.items()}
 
-                    try:
-                        for content_type in content_order:
-                            if content_type.startswith('event_'):
-                                event = next((e for e in events if e['id'] == content_type), None)
-                                if event:
-                                    blurb = current_blurbs.get(content_type, "")
-                                    event_html = generate_single_event_html(event, custom_blurb=blurb)
-                                    if event_html:
-                                        html_blocks.append(event_html)
-                            else:
-                                if courses_df is None:
-                                    continue
-                                courses = courses_df[courses_df['Type'].str.lower() == content_type.rstrip('s')]
-                                if not courses.empty:
-                                    block_blurbs = {k.replace('adults_', ''): v for k, v in current_blurbs.items() if k.startswith(f'{content_type}_')}
-                                    course_html = html_generator.generate_course_block(courses, content_type, custom_blurbs=block_blurbs or None)
-                                    if course_html:
-                                        html_blocks.append(course_html)
-
-                        newsletter_html = html_generator.generate_newsletter_html(html_blocks, subject=None, llm_helper=None, custom_summary=None)
-                        if not newsletter_html:
-                            raise ValueError("Failed to generate newsletter HTML")
+                    # Reuse the previous build when none of its inputs have changed
+                    fingerprint = html_fingerprint(csv_hash, events, content_order, current_blurbs)
+                    html_cache = st.session_state.get('html_cache', {})
 
+                    try:
+                        if fingerprint in html_cache:
+                            newsletter_html, html_blocks = html_cache[fingerprint]
+                        else:
+                            newsletter_html, html_blocks = build_newsletter_html(
+                                html_generator, courses_df, events, content_order, current_blurbs
+                            )
+                            # Only the latest build is kept so the cache can't grow across edits
+                            st.session_state.html_cache = {fingerprint: (newsletter_html, html_blocks)}
                     except Exception as e:
                         st.error(f"❌ Error generating newsletter HTML: {str(e)}")
                         return
@@ -352,12 +377,13 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
                     summary_lines = []
                     for content_type in content_order:
                         if content_type.startswith('event_'):
-                            event = next((e for e in events if e['id'] == content_type), None)
+                            event = events_by_id.get(content_type)
                             if event:
                                 summary_lines.append(f"Event: {event['title']} — {event.get('description', '').split('.')[0]}")
                         elif content_type == 'adults' and courses_df is not None:
-                            courses = courses_df[courses_df['Type'].str.lower() == 'adult']
-                            levels = [lvl for lvl in html_generator.SKILL_LEVEL_ORDER if lvl in courses['Skill Level'].values]
+                            courses = courses_df[courses_df['_type_lc'] == 'adult']
+                            present_levels = set(courses['Skill Level'].dropna())
+                            levels = [lvl for lvl in html_generator.SKILL_LEVEL_ORDER if lvl in present_levels]
                             if levels:
                                 summary_lines.append(f"Adult courses: {', '.join(levels)}")
                         elif content_type == 'juniors' and courses_df is not None:
@@ -365,9 +391,11 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
                     content_summary = "\n".join(summary_lines)
 
                     try:
-                        subject = llm_helper.generate_subject_line(content_summary=content_summary)
-                        preview = llm_helper.generate_preview_text(content_summary=content_summary)
-                        summary = llm_helper.generate_newsletter_summary(content_summary=content_summary)
+                        # One JSON completion returns all three fields.
+                        # Regenerating skips the response cache so the user gets new options.
+                        refresh = st.session_state.content_generated
+                        meta = llm_helper.generate_newsletter_meta(content_summary=content_summary, refresh=refresh)
+                        subject, preview, summary = meta['subject'], meta['preview'], meta['summary']
 
                         st.session_state.subject_lines = subject if subject else "🎾 New Tennis Courses Available!"
                         st.session_state.preview_text = preview if preview else "New courses and fun events this month"
@@ -477,14 +505,82 @@ def app_flow(csv_processor, url_generator, html_generator, llm_helper):
     else:
         st.info("📊 Add at least one event or upload a courses CSV to continue...")
 
+def reorder_content(order: List[str], positions: List[int]) -> List[str]:
+    """Move each item whose position was changed to that position, keeping the rest in their current order"""
+    moved = sorted(
+        (position, i, content_type)
+        for i, (content_type, position) in enumerate(zip(order, positions))
+        if position != i + 1
+    )
+    reordered = [content_type for i, content_type in enumerate(order) if positions[i] == i + 1]
+    # Insert in target order so each moved item lands at the position it was given
+    for position, _, content_type in moved:
+        reordered.insert(position - 1, content_type)
+    return reordered
+
+def apply_content_order(order: List[str]):
+    """Reorder content from the submitted positions"""
+    keys = [f"position_{i}_{content_type}" for i, content_type in enumerate(order)]
+    positions = [st.session_state.get(key, i + 1) for i, key in enumerate(keys)]
+    st.session_state.content_order = reorder_content(order, positions)
+    
+    # Clear the inputs so they show the new order rather than the numbers just typed
+    for key in keys:
+        st.session_state.pop(key, None)
+
+def html_fingerprint(csv_hash: str, events: List[Dict], content_order: List[str], blurbs: Dict[str, str]) -> str:
+    """Fingerprint everything that feeds the newsletter HTML"""
+    payload = json.dumps([csv_hash, events, content_order, blurbs], sort_keys=True)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+def build_newsletter_html(html_generator: HTMLGenerator, courses_df, events: List[Dict], content_order: List[str], current_blurbs: Dict[str, str]):
+    """Build the course and event blocks in order and wrap them into the newsletter HTML"""
+    html_blocks = []
+    events_by_id = {event['id']: event for event in events}
+    # Partition courses by type once instead of rescanning the frame per block
+    courses_by_type = dict(list(courses_df.groupby('_type_lc', observed=True, sort=False))) if courses_df is not None else {}
+
+    for content_type in content_order:
+        if content_type.startswith('event_'):
+            event = events_by_id.get(content_type)
+            if event:
+                blurb = current_blurbs.get(content_type, "")
+                event_html = generate_single_event_html(event, custom_blurb=blurb)
+                if event_html:
+                    html_blocks.append(event_html)
+        else:
+            courses = courses_by_type.get(content_type.rstrip('s'))
+            if courses is not None and not courses.empty:
+                block_blurbs = {k.replace('adults_', ''): v for k, v in current_blurbs.items() if k.startswith(f'{content_type}_')}
+                # Keep the block as unjoined parts; generate_newsletter_html joins everything once
+                course_parts = html_generator.generate_course_block_parts(courses, content_type, custom_blurbs=block_blurbs or None)
+                if course_parts:
+                    html_blocks.append(course_parts)
+
+    newsletter_html = html_generator.generate_newsletter_html(html_blocks, subject=None, llm_helper=None, custom_summary=None)
+    if not newsletter_html:
+        raise ValueError("Failed to generate newsletter HTML")
+
+    return newsletter_html, html_blocks
+
+# Event block templates; optional parts render as empty strings when missing
+_EVENT_TEMPLATE = '<div style="margin: 40px 0;">\n<h2>{title}</h2>{image}{description}{cta}\n</div>'
+_EVENT_IMAGE_TEMPLATE = '\n<img src="{image}" alt="{title}" style="width: 100%; max-width: 600px; margin: 10px auto; display: block;" />'
+_EVENT_DESCRIPTION_TEMPLATE = '\n<p>{description}</p>'
+_EVENT_CTA_TEMPLATE = '''
+
+        <p style="text-align: center;">
+            <a href="{url}" class="cta-button">Book Your Spot</a>
+        </p>
+        '''
+
+_LEGACY_EVENT_TEMPLATE = '<div style="margin: 20px 0; padding: 15px; border: 1px solid #ddd; border-radius: 5px;">\n{image}<h3>{title}</h3>\n<p><strong>When:</strong> {date}</p>\n{cta}</div>'
+_LEGACY_EVENT_IMAGE_TEMPLATE = '<img src="{image}" style="max-width: 100%; height: auto; margin-bottom: 10px;">\n'
+_LEGACY_EVENT_CTA_TEMPLATE = '<a href="{url}" style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 3px; display: inline-block;">Learn More</a>\n'
+
 def generate_single_event_html(event: Dict, llm_helper: LLMHelper = None, custom_blurb: str = None) -> str:
     """Generate HTML for a single event. Uses custom_blurb if provided, otherwise calls LLM."""
     event_title = event.get('title', 'Special Event')
-    html_parts = [f'<div style="margin: 40px 0;">']
-    html_parts.append(f'<h2>{event_title}</h2>')
-
-    if event.get('image'):
-        html_parts.append(f'<img src="{event["image"]}" alt="{event_title}" style="width: 100%; max-width: 600px; margin: 10px auto; display: block;" />')
 
     description = ""
     if custom_blurb is not None:
@@ -495,37 +591,25 @@ def generate_single_event_html(event: Dict, llm_helper: LLMHelper = None, custom
         except Exception as e:
             print(f"LLM event description failed: {e}")
 
-    if description:
-        html_parts.append(f'<p>{description}</p>')
-    
-    if event.get('url'):
-        html_parts.append(f'''
-        <p style="text-align: center;">
-            <a href="{event["url"]}" class="cta-button">Book Your Spot</a>
-        </p>
-        ''')
-    
-    html_parts.append('</div>')
-    
-    return '\n'.join(html_parts)
+    return _EVENT_TEMPLATE.format_map({
+        'title': event_title,
+        'image': _EVENT_IMAGE_TEMPLATE.format(image=event['image'], title=event_title) if event.get('image') else '',
+        'description': _EVENT_DESCRIPTION_TEMPLATE.format(description=description) if description else '',
+        'cta': _EVENT_CTA_TEMPLATE.format(url=event['url']) if event.get('url') else ''
+    })
 
 def generate_events_html(events: List[Dict]) -> str:
     """Generate HTML for multiple events (legacy function)"""
     html_parts = ['<h2>🏆 Special Events</h2>']
-    
-    for event in events:
-        html_parts.append('<div style="margin: 20px 0; padding: 15px; border: 1px solid #ddd; border-radius: 5px;">')
-        
-        if event.get('image'):
-            html_parts.append(f'<img src="{event["image"]}" style="max-width: 100%; height: auto; margin-bottom: 10px;">')
-        
-        html_parts.append(f'<h3>{event["title"]}</h3>')
-        html_parts.append(f'<p><strong>When:</strong> {event["date"]}</p>')
-        
-        if event.get('url'):
-            html_parts.append(f'<a href="{event["url"]}" style="background-color: #4CAF50; color: white; padding: 10px 20px; text-decoration: none; border-radius: 3px; display: inline-block;">Learn More</a>')
-        
-        html_parts.append('</div>')
+    html_parts.extend(
+        _LEGACY_EVENT_TEMPLATE.format_map({
+            'title': event['title'],
+            'date': event['date'],
+            'image': _LEGACY_EVENT_IMAGE_TEMPLATE.format(image=event['image']) if event.get('image') else '',
+            'cta': _LEGACY_EVENT_CTA_TEMPLATE.format(url=event['url']) if event.get('url') else ''
+        })
+        for event in events
+    )
     
     return '\n'.join(html_parts)
 
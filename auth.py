@@ -1,12 +1,25 @@
 import streamlit as st
 import hashlib
+import hmac
+from functools import lru_cache
+
+@lru_cache(maxsize=1)
+def _expected_password_digest():
+    """Hash the configured password once so each attempt only hashes the input"""
+    password = st.secrets.get("password")
+    if not password:
+        return None
+    return hashlib.sha256(password.encode()).digest()
 
 def check_password():
     """Returns `True` if the user had the correct password."""
 
     def password_entered():
         """Checks whether a password entered by the user is correct."""
-        if st.session_state["password"] == st.secrets.get("password"):
+        expected = _expected_password_digest()
+        entered = hashlib.sha256(st.session_state["password"].encode()).digest()
+        # Constant-time comparison so response timing doesn't leak the password
+        if expected is not None and hmac.compare_digest(entered, expected):
             st.session_state["password_correct"] = True
             del st.session_state["password"]  # Don't store password.
         else:
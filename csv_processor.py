@@ -1,13 +1,25 @@
+import io
 import pandas as pd
+import numpy as np
 import re
-from datetime import datetime
 from typing import Dict, List, Any
 
+# pyarrow's multithreaded CSV reader is optional; pandas' C parser is the fallback
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
 class CSVProcessor:
     """Handles CSV processing and data validation deterministically"""
     
     def __init__(self):
         self.required_columns = ['Name', 'Status', 'Start Date', 'Time', 'Type', 'Day', 'Classes', 'Active Participants']
+        # Read required columns as text so dates and times aren't type-inferred;
+        # numeric columns are coerced in _clean_data
+        self.column_dtypes = {col: str for col in self.required_columns}
         self.venue_patterns = {
             'belair': 'Belair Park',
             'dulwich': 'Dulwich Park'
@@ -19,19 +31,23 @@ class CSVProcessor:
             'advanced': 'Advanced'
         }
     
-    def process_csv(self, file) -> pd.DataFrame:
-        """Process uploaded CSV file with validation"""
+    def process_csv(self, file, chunksize: int = None) -> pd.DataFrame:
+        """Process uploaded CSV file with validation, optionally reading large exports chunksize rows at a time"""
         try:
-            # Read CSV
-            df = pd.read_csv(file, encoding='utf-8')
-            
-            # Validate required columns
-            missing_columns = [col for col in self.required_columns if col not in df.columns]
+            # Validate required columns from the header before reading any data
+            columns = pd.read_csv(file, nrows=0).columns
+            missing_columns = [col for col in self.required_columns if col not in columns]
             if missing_columns:
                 raise ValueError(f"Missing required columns: {missing_columns}")
             
-            # Filter for upcoming programs only
-            df = df[df['Status'].str.lower() == 'upcoming'].copy()
+            # Read CSV
+            file.seek(0)
+            if chunksize:
+                # Drop past programs chunk by chunk so only the rows we keep are held in memory
+                chunks = [self._filter_upcoming(chunk) for chunk in self._read_csv_chunks(file, chunksize)]
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=self.required_columns)
+            else:
+                df = self._filter_upcoming(self._read_csv(file))
             
             if df.empty:
                 raise ValueError("No upcoming programs found in CSV")
@@ -47,6 +63,35 @@ class CSVProcessor:
         except Exception as e:
             raise ValueError(f"Error processing CSV: {str(e)}")
     
+    def _read_csv(self, file) -> pd.DataFrame:
+        """Read only the required columns, using pyarrow's parser when it is installed"""
+        if pa_csv is not None and not isinstance(file, io.TextIOBase):
+            convert_options = pa_csv.ConvertOptions(
+                include_columns=self.required_columns,
+                column_types={col: pa.string() for col in self.required_columns},
+                strings_can_be_null=True
+            )
+            # Quoted fields may span lines, and a block boundary can fall inside one
+            parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+            try:
+                return pa_csv.read_csv(file, parse_options=parse_options, convert_options=convert_options).to_pandas()
+            except pa.ArrowInvalid:
+                # pyarrow rejects rows with missing trailing fields, which pandas pads with NaN
+                file.seek(0)
+        
+        # Every column is read as text, so parse in one pass rather than inferring types chunk by chunk
+        return pd.read_csv(file, usecols=self.required_columns, dtype=self.column_dtypes, engine='c', low_memory=False)
+    
+    def _read_csv_chunks(self, file, chunksize: int):
+        """Read the required columns as text in chunks of chunksize rows"""
+        return pd.read_csv(file, usecols=self.required_columns, dtype=self.column_dtypes, engine='c', chunksize=chunksize)
+    
+    def _filter_upcoming(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Keep upcoming programs only; as a category each distinct status is lowercased once"""
+        status = df['Status'].astype('category')
+        upcoming = [value for value in status.cat.categories if value.lower() == 'upcoming']
+        return df[status.isin(upcoming)].copy()
+    
     def _clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and standardize CSV data"""
         # Clean column names
@@ -64,65 +109,54 @@ class CSVProcessor:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
         
+        # Precompute filter columns once instead of lowercasing Type on every filter
+        df['_type_lc'] = df['Type'].str.lower()
+        df['_is_event'] = (
+            df['_type_lc'].str.contains('event|session|drop', na=False) |
+            (df['Classes'] == 1)
+        )
+        
+        # Low-cardinality columns compare as small integer codes when categorical
+        for col in ['Status', 'Type', 'Day', '_type_lc']:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        
         return df
     
     def _add_derived_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add derived columns for easier processing"""
         # Extract venue from name
-        df['Venue'] = df['Name'].apply(self._extract_venue)
+        df['Venue'] = self._extract_label(df['Name'], self.venue_patterns, 'Unknown Venue')
         
         # Extract skill level from name
-        df['Skill Level'] = df['Name'].apply(self._extract_skill_level)
+        df['Skill Level'] = self._extract_label(df['Name'], self.skill_levels, 'Unknown')
         
         # Determine if limited spots
         df['Limited Spots'] = df['Active Participants'] > 8
         
-        # Format start date
-        df['Formatted Start Date'] = df['Start Date'].apply(self._format_date)
+        # Format start date, keeping the original text where it can't be parsed
+        start_dates = self._parse_dates(df['Start Date'])
+        df['Formatted Start Date'] = start_dates.dt.strftime('%d %b %Y').where(start_dates.notna(), df['Start Date'])
         
         # Calculate duration text
-        df['Duration Text'] = df['Classes'].apply(lambda x: f"{x} weeks" if x > 1 else f"{x} week")
+        classes = df['Classes'].astype(str)
+        df['Duration Text'] = np.where(df['Classes'] > 1, classes + ' weeks', classes + ' week')
         
         return df
     
-    def _extract_venue(self, name: str) -> str:
-        """Extract venue from course name deterministically"""
-        name_lower = name.lower()
-        
-        if 'belair' in name_lower:
-            return 'Belair Park'
-        elif 'dulwich' in name_lower:
-            return 'Dulwich Park'
-        else:
-            return 'Unknown Venue'
+    def _extract_label(self, values: pd.Series, labels: Dict[str, str], default: str) -> pd.Categorical:
+        """Map each value to the label of the first pattern, in priority order, that it contains"""
+        # Lowercase once, then let np.select pick the earliest matching pattern per row
+        lowered = values.str.lower()
+        conditions = [lowered.str.contains(pattern, regex=False, na=False).to_numpy(dtype=bool) for pattern in labels]
+        categories = [*labels.values(), default]
+        return pd.Categorical(np.select(conditions, list(labels.values()), default), categories=categories)
     
-    def _extract_skill_level(self, name: str) -> str:
-        """Extract skill level from course name deterministically"""
-        name_lower = name.lower()
-        
-        if 'beginner' in name_lower:
-            return 'Beginner'
-        elif 'improver' in name_lower:
-            return 'Improver'
-        elif 'intermediate' in name_lower:
-            return 'Intermediate'
-        elif 'advanced' in name_lower:
-            return 'Advanced'
-        else:
-            return 'Unknown'
-    
-    def _format_date(self, date_str: str) -> str:
-        """Format date string consistently"""
-        try:
-            # Handle different date formats
-            if '/' in date_str:
-                date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-            else:
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            
-            return date_obj.strftime('%d %b %Y')
-        except:
-            return date_str
+    def _parse_dates(self, dates: pd.Series) -> pd.Series:
+        """Parse DD/MM/YYYY or YYYY-MM-DD dates for the whole column, NaT where neither matches"""
+        day_first = pd.to_datetime(dates, format='%d/%m/%Y', errors='coerce')
+        iso = pd.to_datetime(dates, format='%Y-%m-%d', errors='coerce')
+        return day_first.fillna(iso)
     
     def get_content_types(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Get available content types from processed data"""
@@ -148,23 +182,20 @@ class CSVProcessor:
         }
         
         # Check for adult courses
-        adult_courses = df[df['Type'].str.lower() == 'adult']
+        adult_courses = df[df['_type_lc'] == 'adult']
         if not adult_courses.empty:
             content_types['adults']['available'] = True
             content_types['adults']['count'] = len(adult_courses)
             content_types['adults']['levels'] = adult_courses['Skill Level'].unique().tolist()
         
         # Check for junior courses
-        junior_courses = df[df['Type'].str.lower() == 'junior']
+        junior_courses = df[df['_type_lc'] == 'junior']
         if not junior_courses.empty:
             content_types['juniors']['available'] = True
             content_types['juniors']['count'] = len(junior_courses)
         
         # Check for events (sessions with specific themes or one-off events)
-        event_courses = df[
-            (df['Type'].str.lower().str.contains('event|session|drop', na=False)) |
-            (df['Classes'] == 1)
-        ]
+        event_courses = df[df['_is_event']]
         if not event_courses.empty:
             content_types['events']['available'] = True
             content_types['events']['count'] = len(event_courses)
@@ -174,13 +205,10 @@ class CSVProcessor:
     def get_courses_by_type(self, df: pd.DataFrame, content_type: str) -> pd.DataFrame:
         """Get courses filtered by content type"""
         if content_type == 'adults':
-            return df[df['Type'].str.lower() == 'adult']
+            return df[df['_type_lc'] == 'adult']
         elif content_type == 'juniors':
-            return df[df['Type'].str.lower() == 'junior']
+            return df[df['_type_lc'] == 'junior']
         elif content_type == 'events':
-            return df[
-                (df['Type'].str.lower().str.contains('event|session|drop', na=False)) |
-                (df['Classes'] == 1)
-            ]
+            return df[df['_is_event']]
         else:
             return pd.DataFrame() 
\ No newline at end of file
@@ -1,7 +1,8 @@
 import pandas as pd
-from typing import Dict, List, Any
+import numpy as np
+from urllib.parse import urlencode
+from typing import Dict, List, Any, Union
 from llm_helper import LLMHelper
-from datetime import datetime
 
 class HTMLGenerator:
     """Generates HTML blocks for newsletter content"""
@@ -24,8 +25,18 @@ class HTMLGenerator:
     SKILL_LEVEL_ORDER = ['Beginner', 'Improver', 'Intermediate', 'Advanced']
     
     ADULT_BOOKING_URL = "https://clubspark.lta.org.uk/VamosTennis/Coaching/Adult"
+    FALLBACK_BOOKING_DATE = "2025-08-03T00:00:00.000Z"
     JUNIOR_BOOKING_URL = "https://clubspark.lta.org.uk/VamosTennis/Coaching/Junior"
     
+    BOOKING_BUTTON_TEMPLATE = '''
+        <p style="text-align: center;">
+            <a href="{url}" class="cta-button">{button_text}</a>
+        </p>
+        '''
+    # Buttons without a skill level never change, so build them once
+    DEFAULT_BOOKING_BUTTON = BOOKING_BUTTON_TEMPLATE.format(url=ADULT_BOOKING_URL, button_text="Book Your Place")
+    JUNIOR_BOOKING_BUTTON = BOOKING_BUTTON_TEMPLATE.format(url=JUNIOR_BOOKING_URL, button_text="Book Junior Courses")
+    
     BLOCK_CONFIGS = {
         'adults': {
             'title': 'Adult Courses',
@@ -45,23 +56,40 @@ class HTMLGenerator:
         # Optional LLM helper for creative content
         self.llm_helper = llm_helper
     
-    def _format_course_item(self, course: pd.Series, include_venue: bool = True) -> str:
-        """Format a single course as HTML list item"""
-        venue = course.get('Venue', 'Unknown Venue')
-        day = course.get('Day', '')
-        time = self._format_time(course.get('Time', ''))
-        duration = course.get('Duration Text', '')
-        start_date = self._format_short_date(course.get('Formatted Start Date', course.get('Start Date', '')))
-        spots = course.get('Active Participants', 0)
-        
-        limited_spots = " <strong>(Limited spots!)</strong>" if spots >= 7 and spots < 10 else ""
-        full_spots = " <strong>(Full!)</strong>" if spots >= 10 else ""
+    def _format_course_items(self, courses: pd.DataFrame, include_venue: bool = True) -> List[str]:
+        """Format every course as an HTML list item using whole-column operations"""
+        def column(name: str, default: Any = '') -> pd.Series:
+            if name in courses:
+                return courses[name]
+            return pd.Series(default, index=courses.index)
+        
+        days = column('Day').astype(str)
+        times = self._format_time_series(column('Time'))
+        venues = column('Venue', 'Unknown Venue').astype(str)
+        durations = column('Duration Text').astype(str)
+        
+        # Shorten "04 Aug 2025" to "4 Aug"; anything else is left as it is
+        date_column = 'Formatted Start Date' if 'Formatted Start Date' in courses else 'Start Date'
+        start_dates = column(date_column).astype(str).str.replace(r'^0*(\d+) ([^ ]*) [^ ]*$', r'\1 \2', regex=True)
+        
+        spots = column('Active Participants', 0).to_numpy()
+        suffixes = np.where(
+            spots >= 10, " <strong>(Full!)</strong>",
+            np.where(spots >= 7, " <strong>(Limited spots!)</strong>", "")
+        )
         
         # Format: "Monday 5pm @ Dulwich Park — 4 weeks starting 4 Aug"
         if include_venue:
-            return f'<li>{day} {time} @ {venue} — {duration} starting {start_date}{limited_spots}{full_spots}</li>'
-        else:
-            return f'<li>{day} {time} — {duration} starting {start_date}{limited_spots}{full_spots}</li>'
+            return [
+                f'<li>{day} {time} @ {venue} — {duration} starting {start_date}{suffix}</li>'
+                for day, time, venue, duration, start_date, suffix
+                in zip(days, times, venues, durations, start_dates, suffixes)
+            ]
+        return [
+            f'<li>{day} {time} — {duration} starting {start_date}{suffix}</li>'
+            for day, time, duration, start_date, suffix
+            in zip(days, times, durations, start_dates, suffixes)
+        ]
     
     def _generate_course_list(self, courses: pd.DataFrame, group_by: str = None, include_venue: bool = True, custom_blurbs: dict = None) -> List[str]:
         """Generate HTML list items for courses with optional grouping"""
@@ -69,63 +97,73 @@ class HTMLGenerator:
 
         if group_by:
             if group_by == 'Skill Level':
-                # Sort by predefined skill level order
-                grouped = courses.groupby(group_by)
-                sorted_groups = []
-                for group_name, group_courses in grouped:
-                    if group_name != 'Unknown':
-                        sorted_groups.append((group_name, group_courses))
+                # Group on an ordered categorical so groups come out in skill level order;
+                # 'Unknown' has no category and drops out, other levels follow alphabetically
+                other_levels = set(courses[group_by].dropna().unique()) - set(self.SKILL_LEVEL_ORDER) - {'Unknown'}
+                levels = pd.Categorical(
+                    courses[group_by],
+                    categories=self.SKILL_LEVEL_ORDER + sorted(other_levels),
+                    ordered=True
+                )
+                grouped = courses.groupby(levels, sort=True, observed=True)
+
+                groups = list(grouped)
 
-                # Sort groups according to skill level order
-                sorted_groups.sort(key=lambda x: self.SKILL_LEVEL_ORDER.index(x[0]) if x[0] in self.SKILL_LEVEL_ORDER else 999)
+                # Every level's booking link starts from the same date, so parse it once per block
+                earliest_date = self._extract_earliest_date(courses)
 
-                for group_name, group_courses in sorted_groups:
+                # Request LLM descriptions for levels without a custom blurb in one concurrent batch
+                level_descriptions = {}
+                missing_levels = [group_name for group_name, _ in groups if not (custom_blurbs and group_name in custom_blurbs)]
+                if self.llm_helper and missing_levels:
+                    try:
+                        level_descriptions = self.llm_helper.generate_level_descriptions(missing_levels)
+                    except Exception as e:
+                        print(f"LLM level description failed: {e}")
+
+                for group_name, group_courses in groups:
                     html_parts.append(f'<h3>{group_name}</h3>')
 
-                    # Use custom blurb if provided, otherwise try LLM
+                    # Use custom blurb if provided, otherwise the LLM description
                     if custom_blurbs and group_name in custom_blurbs:
                         level_description = custom_blurbs[group_name]
-                        if level_description:
-                            html_parts.append(f'<p>{level_description}</p>')
-                    elif self.llm_helper:
-                        try:
-                            level_description = self.llm_helper.generate_level_description(group_name)
-                            if level_description:
-                                html_parts.append(f'<p>{level_description}</p>')
-                        except Exception as e:
-                            print(f"LLM level description failed: {e}")
+                    else:
+                        level_description = level_descriptions.get(group_name)
+                    if level_description:
+                        html_parts.append(f'<p>{level_description}</p>')
                     
                     html_parts.append('<ul>')
-                    for _, course in group_courses.iterrows():
-                        html_parts.append(self._format_course_item(course, include_venue))
+                    html_parts.extend(self._format_course_items(group_courses, include_venue))
                     html_parts.append('</ul>')
                     
                     # Add booking button for this skill level
-                    booking_button = self.generate_booking_button(group_name, courses)
+                    booking_button = self.generate_booking_button(group_name, earliest_date)
                     html_parts.append(booking_button)
             else:
                 # For other grouping types, use default behavior
-                grouped = courses.groupby(group_by)
+                grouped = courses.groupby(group_by, observed=True)
                 for group_name, group_courses in grouped:
                     if group_name == 'Unknown':
                         continue
                     html_parts.append(f'<h3>{group_name}</h3>')
                     html_parts.append('<ul>')
-                    for _, course in group_courses.iterrows():
-                        html_parts.append(self._format_course_item(course, include_venue))
+                    html_parts.extend(self._format_course_items(group_courses, include_venue))
                     html_parts.append('</ul>')
         else:
             html_parts.append('<ul>')
-            for _, course in courses.iterrows():
-                html_parts.append(self._format_course_item(course, include_venue))
+            html_parts.extend(self._format_course_items(courses, include_venue))
             html_parts.append('</ul>')
         
         return html_parts
     
     def generate_course_block(self, courses: pd.DataFrame, block_type: str = 'adults', custom_blurbs: dict = None) -> str:
         """Generate HTML block for courses with flexible configuration"""
+        return '\n'.join(self.generate_course_block_parts(courses, block_type, custom_blurbs))
+    
+    def generate_course_block_parts(self, courses: pd.DataFrame, block_type: str = 'adults', custom_blurbs: dict = None) -> List[str]:
+        """Generate the HTML parts of a course block, left unjoined so the newsletter is joined once"""
         if courses.empty:
-            return ""
+            return []
         
         # Get configuration from class constants
         config = self.BLOCK_CONFIGS.get(block_type, self.BLOCK_CONFIGS['adults']).copy()
@@ -161,7 +199,7 @@ class HTMLGenerator:
         if block_type == 'juniors':
             html_parts.append(self.generate_junior_booking_button())
         
-        return '\n'.join(html_parts)
+        return html_parts
     
     def _generate_junior_explanation(self, courses: pd.DataFrame = None) -> List[str]:
         """Generate junior age groups explanation using course names from CSV"""
@@ -174,10 +212,12 @@ class HTMLGenerator:
                 '</ul>'
             ]
         
-        # Use formatted course names
+        # Use formatted course names; plain tuples avoid building a Series per row
+        course_fields = courses.reindex(columns=['Name', 'Day', 'Time', 'Venue'], fill_value='')
+        course_fields['Time'] = self._format_time_series(course_fields['Time'])
         course_names = []
-        for _, course in courses.iterrows():
-            formatted_name = self._format_junior_course_name(course)
+        for name, day, time, venue in course_fields.itertuples(index=False, name=None):
+            formatted_name = self._format_junior_course_name(name, day, time, venue)
             if formatted_name:
                 course_names.append(formatted_name)
         
@@ -223,48 +263,35 @@ class HTMLGenerator:
     
     def _extract_earliest_date(self, courses_df: pd.DataFrame) -> str:
         """Extract the earliest start date from courses and format for booking URL"""
-        if courses_df.empty:
-            return "2025-08-03T00:00:00.000Z"  # Fallback date
+        if courses_df is None or courses_df.empty or 'Start Date' not in courses_df:
+            return self.FALLBACK_BOOKING_DATE
         
-        try:
-            # Parse dates properly before finding the minimum
-            def parse_date(d):
-                s = str(d)
-                if '/' in s:
-                    return datetime.strptime(s, '%d/%m/%Y')
-                return datetime.strptime(s, '%Y-%m-%d')
-
-            parsed_dates = courses_df['Start Date'].apply(parse_date)
-            date_obj = parsed_dates.min()
-            
-            # Format as ISO string for URL
-            return date_obj.strftime('%Y-%m-%dT00:00:00.000Z')
-        except:
-            return "2025-08-03T00:00:00.000Z"  # Fallback date
+        # Parse the whole column at once, accepting both ClubSpark date formats
+        start_dates = courses_df['Start Date'].astype(str)
+        parsed_dates = pd.to_datetime(start_dates, format='%d/%m/%Y', errors='coerce')
+        parsed_dates = parsed_dates.fillna(pd.to_datetime(start_dates, format='%Y-%m-%d', errors='coerce'))
+        
+        earliest = parsed_dates.min()
+        if pd.isna(earliest):
+            return self.FALLBACK_BOOKING_DATE
+        
+        # Format as ISO string for URL
+        return earliest.strftime('%Y-%m-%dT00:00:00.000Z')
     
-    def generate_booking_button(self, skill_level: str = None, courses_df: pd.DataFrame = None) -> str:
-        """Generate booking button HTML with ClubSpark URL"""
-        if skill_level and skill_level in self.SKILL_LEVELS:
-            level_id = self.SKILL_LEVELS[skill_level]
-            url = f"{self.ADULT_BOOKING_URL}?skill-level%5B%5D={level_id}&date-range[]=%22{self._extract_earliest_date(courses_df)}%22"
-            button_text = f"Book {skill_level}"
-        else:
-            url = self.ADULT_BOOKING_URL
-            button_text = "Book Your Place"
+    def generate_booking_button(self, skill_level: str = None, earliest_date: str = None) -> str:
+        """Generate booking button HTML with ClubSpark URL, starting from an ISO date from _extract_earliest_date"""
+        if not skill_level or skill_level not in self.SKILL_LEVELS:
+            return self.DEFAULT_BOOKING_BUTTON
         
-        return f'''
-        <p style="text-align: center;">
-            <a href="{url}" class="cta-button">{button_text}</a>
-        </p>
-        '''
+        query = urlencode({
+            'skill-level[]': self.SKILL_LEVELS[skill_level],
+            'date-range[]': f'"{earliest_date or self.FALLBACK_BOOKING_DATE}"'
+        }, safe=':')
+        return self.BOOKING_BUTTON_TEMPLATE.format(url=f"{self.ADULT_BOOKING_URL}?{query}", button_text=f"Book {skill_level}")
     
     def generate_junior_booking_button(self) -> str:
         """Generate booking button HTML for junior courses"""
-        return f'''
-        <p style="text-align: center;">
-            <a href="{self.JUNIOR_BOOKING_URL}" class="cta-button">Book Junior Courses</a>
-        </p>
-        '''
+        return self.JUNIOR_BOOKING_BUTTON
     
     def _format_time(self, time_str: str) -> str:
         """Convert 24-hour time to 12-hour format"""
@@ -289,6 +316,28 @@ class HTMLGenerator:
         except:
             return time_str
     
+    def _format_time_series(self, times: pd.Series) -> pd.Series:
+        """Convert a column of 24-hour times to 12-hour format, matching _format_time"""
+        times = times.astype(str)
+        parts = times.str.extract(r'^(\d{1,4}):(\d{1,4})$')
+        matched = parts[0].notna().to_numpy()
+        
+        # Anything that isn't a plain H:MM value goes through the scalar formatter
+        formatted = times.to_numpy(dtype=object, copy=True)
+        formatted[~matched] = [self._format_time(time) for time in formatted[~matched]]
+        
+        if matched.any():
+            hours = parts.loc[matched, 0].astype(int)
+            minutes = parts.loc[matched, 1].astype(int)
+            
+            # Only show :MM if minutes != 00
+            hour_12 = hours.where(hours <= 12, hours - 12).where(hours != 0, 12)
+            minute_str = (':' + minutes.astype(str).str.zfill(2)).where(minutes != 0, '')
+            suffix = np.where(hours >= 12, 'pm', 'am')
+            formatted[matched] = (hour_12.astype(str) + minute_str + suffix).to_numpy(dtype=object)
+        
+        return pd.Series(formatted, index=times.index)
+    
     def _format_short_date(self, date_str: str) -> str:
         """Format date to short format like '4 Aug'"""
         try:
@@ -300,14 +349,9 @@ class HTMLGenerator:
         except:
             return date_str
     
-    def _format_junior_course_name(self, course: pd.Series) -> str:
-        """Format junior course name to 'Blue (ages 4-6) Saturday 8.45am @ Dulwich Park'"""
+    def _format_junior_course_name(self, course_name: str, day: str = '', time: str = '', venue: str = '') -> str:
+        """Format junior course name to 'Blue (ages 4-6) Saturday 8.45am @ Dulwich Park' from an already formatted time"""
         try:
-            course_name = course.get('Name', '')
-            day = course.get('Day', '')
-            time = self._format_time(course.get('Time', ''))
-            venue = course.get('Venue', '')
-            
             # Extract color and age group from course name
             # e.g., "Blue (ages 4-6) Saturdays @ Dulwich Park (8 weeks)"
             if '(' in course_name and ')' in course_name:
@@ -328,70 +372,50 @@ class HTMLGenerator:
             # Fallback to original name if parsing fails
             return course_name
         except:
-            return course.get('Name', '')
+            return course_name
     
-    def generate_newsletter_html(self, blocks: List[str], subject: str = None, llm_helper: LLMHelper = None, custom_summary: str = None) -> str:
-        """Combine all blocks into a complete newsletter HTML"""
-        html_parts = [
-            '<div style="width: 100%; display: flex; justify-content: center; align-items: flex-start;">',
-            '<div style="font-family: Arial, sans-serif; max-width: 600px; width: 100%; box-sizing: border-box; text-align: left; padding: 0 20px;">'
-        ]
-        
+    def generate_newsletter_html(self, blocks: List[Union[str, List[str]]], subject: str = None, llm_helper: LLMHelper = None, custom_summary: str = None) -> str:
+        """Combine all blocks, given as HTML strings or lists of parts, into a complete newsletter HTML"""
+        content_parts = []
         for block in blocks:
-            if block.strip():
-                html_parts.append(block)
+            parts = [block] if isinstance(block, str) else block
+            if any(part.strip() for part in parts):
+                content_parts.extend(parts)
         
-        html_parts.append('</div>')  # Close inner div
-        html_parts.append('</div>')  # Close outer flex div
-        
-        # Generate the complete HTML first
-        complete_html = '\n'.join(html_parts)
+        # Settle the summary first so the page only has to be joined once
+        summary_text = custom_summary
+        llm_summary = False
+        if not custom_summary and llm_helper:
+            try:
+                # The wrapper divs carry no text, so the blocks alone give the LLM the same content
+                summary_text = llm_helper.generate_newsletter_metadata_from_html('\n'.join(content_parts)).get('summary')
+                llm_summary = bool(summary_text)
+            except Exception as e:
+                print(f"Error adding newsletter summary: {e}")
+                summary_text = None
         
-        # Add summary at the top if custom summary is provided
-        if custom_summary:
-            summary_html = f'''
-        <div style="margin: 40px 0;">
-          <p>{custom_summary}</p>
-        </div>
-        '''
-            # Insert summary after the title but before the content
+        if llm_summary:
+            html_parts = ['<div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; width: 100%; box-sizing: border-box; text-align: left;">']
+            if subject:
+                html_parts.append(f'<h1>{subject}</h1>')
+        else:
             html_parts = [
                 '<div style="width: 100%; display: flex; justify-content: center; align-items: flex-start;">',
                 '<div style="font-family: Arial, sans-serif; max-width: 600px; width: 100%; box-sizing: border-box; text-align: left; padding: 0 20px;">'
             ]
-            html_parts.append(summary_html)
-            
-            for block in blocks:
-                if block.strip():
-                    html_parts.append(block)
-            
-            html_parts.append('</div>')  # Close inner div
-            html_parts.append('</div>')  # Close outer flex div
-            complete_html = '\n'.join(html_parts)
-        # Add summary at the top if LLM helper is available (fallback)
-        elif llm_helper:
-            try:
-                summary_text = llm_helper.generate_newsletter_summary_from_html(complete_html)
-                if summary_text:
-                    summary_html = f'''
+        
+        # Add summary at the top, before the content
+        if summary_text:
+            html_parts.append(f'''
         <div style="margin: 40px 0;">
           <p>{summary_text}</p>
         </div>
-        '''
-                    # Insert summary after the title but before the content
-                    html_parts = ['<div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; width: 100%; box-sizing: border-box; text-align: left;">']
-                    if subject:
-                        html_parts.append(f'<h1>{subject}</h1>')
-                    html_parts.append(summary_html)
-                    
-                    for block in blocks:
-                        if block.strip():
-                            html_parts.append(block)
-                    
-                    html_parts.append('</div>')
-                    complete_html = '\n'.join(html_parts)
-            except Exception as e:
-                print(f"Error adding newsletter summary: {e}")
+        ''')
         
-        return complete_html
-    
+        html_parts.extend(content_parts)
+        
+        html_parts.append('</div>')  # Close inner div
+        if not llm_summary:
+            html_parts.append('</div>')  # Close outer flex div
+        
+        return '\n'.join(html_parts)
@@ -0,0 +1,72 @@
+import os
+import json
+import hashlib
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+
+class LLMResponseCache:
+    """Persists LLM responses on disk so identical prompts skip the API"""
+
+    # Entries older than this are ignored so stale copy eventually gets regenerated
+    TTL_SECONDS = 30 * 24 * 60 * 60
+
+    def __init__(self, cache_dir: str = ".llm_cache", ttl_seconds: int = TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        # In-memory layer for repeat hits within the same process, storing (response, created)
+        self._memory: Dict[str, Tuple[str, float]] = {}
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Build a cache key from everything that affects the response"""
+        raw = '|'.join(str(part) for part in parts)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss or expired entry"""
+        if key in self._memory:
+            response, created = self._memory[key]
+            return None if self._expired(created) else response
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            response, created = entry['response'], float(entry.get('created', 0))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if self._expired(created):
+            return None
+
+        self._memory[key] = (response, created)
+        return response
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response, ignoring disk errors so caching never breaks generation"""
+        created = time.time()
+        self._memory[key] = (response, created)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temp file first so concurrent readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'response': response, 'created': created}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing LLM cache: {e}")
+
+    def delete(self, key: str) -> None:
+        """Remove an entry, e.g. one that turned out to be unusable"""
+        self._memory.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
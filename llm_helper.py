@@ -1,6 +1,25 @@
 import os
-from typing import List, Dict, Any
-from openai import OpenAI
+import re
+import json
+import asyncio
+import threading
+import httpx
+from html import unescape
+from typing import List, Dict, Any, Callable
+from openai import OpenAI, AsyncOpenAI
+from llm_cache import LLMResponseCache
+
+# selectolax's C parser is optional; the regex tag stripper is the fallback
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# Compiled once; used to strip tags from newsletter HTML before prompting
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# List markers the model sometimes adds to a line: "1. ", "2) ", "3- " and/or "- "
+_NUMBERING_RE = re.compile(r'^(?:\d{1,2}[.)\-](?:\s+|$))?(?:-\s+)?')
 
 class LLMHelper:
     """Handles LLM interactions for newsletter content generation"""
@@ -10,6 +29,11 @@ class LLMHelper:
     MAX_TOKENS = 150
     TEMPERATURE = 0.7
     
+    # Plain text replies are requested as {"text": ...} in JSON mode so they arrive
+    # without the quotes and list markers the model tends to add
+    TEXT_RESPONSE_INSTRUCTION = 'Respond with a JSON object with a single key "text" holding only that text.'
+    TEXT_RESPONSE_TOKENS = 10  # Headroom for the JSON wrapper around the text
+    
     # Fallback subject line
     FALLBACK_SUBJECT_LINE = "🎾 New Courses Available!"
     
@@ -29,17 +53,188 @@ class LLMHelper:
     
     FALLBACK_PREVIEW_TEXT = "New courses and fun events this July"
     FALLBACK_NEWSLETTER_SUMMARY = "Check out what's coming up this month — from new tennis courses to help you improve your game!"
-    FALLBACK_EVENT_DESCRIPTION = "Join us for a fun adult doubles tournament at Belair Park. Whether you're coming solo or with a partner, it's a great way to meet other players and enjoy some friendly matchplay in the sun."
+    FALLBACK_EVENT_DESCRIPTIONS = {
+        'default': "Join us for a fun adult doubles tournament at Belair Park. Whether you're coming solo or with a partner, it's a great way to meet other players and enjoy some friendly matchplay in the sun."
+    }
+
+    # System prompts hold the fixed rules and examples. They are sent first and are
+    # identical on every call, so the provider can reuse its cached prompt prefix.
+    SUBJECT_LINE_SYSTEM_PROMPT = """
+    You write subject lines for a community tennis newsletter from Vamos Tennis in Belair and Dulwich, South East London.
+
+    Rules:
+    - Be specific to the newsletter contents you are given — mention the real things on offer
+    - Tone: clear and direct, lightly warm — not hyped, not cheesy
+    - One emoji max, at the start
+    - No exclamation marks unless it's genuinely warranted
+    - Under 60 characters
+
+    Good examples (notice they reference real content, not vague phrases):
+    - 🎾 Adult courses & junior camps open for booking
+    - 📅 New courses + July tournament — book your spot
+    - 🎾 Beginner to Advanced: courses now open at Dulwich & Belair
+
+    Bad examples (too vague or cheesy — avoid these):
+    - Summer Tennis is Here — Courses, Camps & More
+    - Tennis in the sun? We've got you covered
+    - 🔥 What's New This Month
+
+    Return only the subject line.
+    """
+
+    PREVIEW_TEXT_SYSTEM_PROMPT = """
+    You write the preview text (shown in email inboxes before opening) for a community tennis newsletter.
+
+    Rules:
+    - Under 150 characters
+    - Reference the actual content — don't be vague
+    - Only mention specific dates if they are present in the newsletter contents you are given — do not invent them
+    - Tone: conversational, like a quick heads-up from a friend
+    - No emoji
+    - No exclamation marks
+
+    Good examples:
+    - Adult and junior courses now open — plus a social doubles tournament on 19 July at Belair Park
+    - Beginner to Advanced courses at Dulwich and Belair, with junior camps starting next month
+
+    Bad examples (too vague):
+    - New courses and fun events this July
+    - Summer tennis is here — join a course, camp or tournament
+
+    Return only the preview text.
+    """
+
+    BLOCK_DESCRIPTION_SYSTEM_PROMPT = """
+    You are helping write short introductory summary text for sections in a community tennis newsletter.
+
+    Each section includes a list of courses or camps (e.g. Adults or Juniors).
+
+    Your job is to write **1–2 warm, friendly lines** introducing what’s on offer, just before the bullet list.
+
+    Audience: casual adult players or parents of juniors
+    Tone: inviting, clear, and upbeat — like a trusted local coach
+    Do **not** start with an emoji.
+
+    Only mention specific dates or timing if they are clearly present in the provided content — do not invent them. Avoid sounding too salesy.
+    """
+
+    LEVEL_DESCRIPTION_SYSTEM_PROMPT = """
+    You write short, engaging descriptions for tennis skill levels.
+
+    Requirements:
+    - Keep under 100 characters
+    - Be encouraging and motivating
+    - Explain what this level is for
+    - Use natural, friendly tone
+    - No emojis
+
+    Examples:
+    - Perfect for those new to tennis or returning after a break.
+    - For players who are confident rallying and ready to level up.
+
+    Return only the description (no level name, no quotes).
+    """
+
+    EVENT_DESCRIPTION_SYSTEM_PROMPT = """
+    You are writing a short, friendly description for a block to be included in a community tennis newsletter.
+
+    You will be given the event description and title the user provided. Keep the key details but make it sound more inviting and natural.
+
+    Style: max 3 sentences
+    Include: a short summary of the vibe or activity (e.g. social doubles, holiday camps, drop-ins)
+    Only mention date, time, and location if they are explicitly provided in the event info — do not invent or assume them.
+    Do not mention a venue name unless it is explicitly stated in the event info.
+    Audience: adult recreational tennis players and parents of junior players in South London
+    Tone: warm, clear, and lightly enthusiastic (not too salesy or overhyped). Limited emojis in the description
+
+    Example (only if date/location were provided in the input):
+    - Join us for a fun adult doubles tournament. Whether you're coming solo or with a partner, it's a great way to meet other players and enjoy some friendly matchplay in the sun.
+
+    Return only the rewritten event description.
+    """
+
+    NEWSLETTER_SUMMARY_SYSTEM_PROMPT = """
+    You write a short intro paragraph (1–2 sentences) for a community tennis newsletter from Vamos Tennis in South London.
+
+    Rules:
+    - Name the specific things on offer — don't be vague
+    - Tone: like a friendly coach giving a quick roundup, not a marketing email
+    - If there's a named event (e.g. a tournament or camp), mention it by name
+    - Only mention specific dates if they are present in the newsletter contents you are given — do not invent them
+    - One emoji is fine, but not at the very start
+    - No exclamation marks
+
+    Good examples:
+    - Courses are back across Dulwich and Belair this month, with sessions from Beginner to Advanced — plus a social doubles tournament on 19 July.
+    - We've got adult courses starting this week and junior holiday camps running every Saturday from late July. There's also a social tournament coming up if you fancy some match play.
+
+    Bad examples:
+    - Summer tennis is here — join a course, camp or tournament
+    - Check out what's coming up this month — from new tennis courses to help you improve your game
+
+    Return only the intro paragraph.
+    """
+
+    NEWSLETTER_META_SYSTEM_PROMPT = """
+    You write the subject line, preview text and intro paragraph for a community tennis newsletter from Vamos Tennis in Belair and Dulwich, South East London.
+
+    Rules for all three:
+    - Be specific to the newsletter contents you are given — mention the real things on offer
+    - Only mention specific dates if they are present in the newsletter contents — do not invent them
+
+    "subject" — the email subject line:
+    - Tone: clear and direct, lightly warm — not hyped, not cheesy
+    - One emoji max, at the start
+    - No exclamation marks unless it's genuinely warranted
+    - Under 60 characters
+    - Good: 🎾 Adult courses & junior camps open for booking
+    - Bad: 🔥 What's New This Month
+
+    "preview" — the preview text shown in email inboxes before opening:
+    - Under 150 characters
+    - Tone: conversational, like a quick heads-up from a friend
+    - No emoji, no exclamation marks
+    - Good: Beginner to Advanced courses at Dulwich and Belair, with junior camps starting next month
+    - Bad: New courses and fun events this July
+
+    "summary" — a short intro paragraph (1–2 sentences):
+    - Tone: like a friendly coach giving a quick roundup, not a marketing email
+    - If there's a named event (e.g. a tournament or camp), mention it by name
+    - One emoji is fine, but not at the very start
+    - No exclamation marks
+    - Good: Courses are back across Dulwich and Belair this month, with sessions from Beginner to Advanced — plus a social doubles tournament on 19 July.
+    - Bad: Summer tennis is here — join a course, camp or tournament
+
+    Return a JSON object with exactly the keys "subject", "preview" and "summary".
+    """
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, http_client: httpx.AsyncClient = None, cache: bool = True):
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if self.api_key:
             self.client = OpenAI(api_key=self.api_key)
+            # Optional shared httpx client lets callers tune pooling for concurrent calls
+            self.async_client = AsyncOpenAI(api_key=self.api_key, http_client=http_client)
         else:
             self.client = None
+            self.async_client = None
+        
+        # Responses persist across reruns so identical prompts don't hit the API again;
+        # pass cache=False to always call the API
+        self.cache = LLMResponseCache() if cache else None
+        
+        # Levels and block types come from a handful of fixed values, so keep their
+        # descriptions in memory and skip prompt building and cache lookups entirely
+        self._level_desc_cache: Dict[str, str] = {}
+        self._block_desc_cache: Dict[str, str] = {}
+        # Events are keyed on (title, hash of description) so unchanged events aren't regenerated on rerun
+        self._event_desc_cache: Dict[tuple, str] = {}
+        
+        # Event loop used to run concurrent LLM calls, started on first use
+        self._loop = None
+        self._loop_lock = threading.Lock()
     
     def _clean_llm_response(self, response: str) -> str:
-        """Clean LLM response by removing quotes, numbering, and extra formatting"""
+        """Clean LLM response by removing quotes, numbering, and extra formatting (fallback for non-JSON replies)"""
         if not response or response is None:
             return ""
         
@@ -50,41 +245,25 @@ class LLMHelper:
         elif cleaned.startswith("'") and cleaned.endswith("'"):
             cleaned = cleaned[1:-1]
         
-        # Remove numbering (1., 2., etc.)
-        lines = cleaned.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            line = line.strip()
-            # Remove numbering patterns
-            if line and not line[0].isdigit() or (line[0].isdigit() and len(line) > 1 and line[1] in ['.', ')', '-']):
-                # Remove numbered prefixes
-                if line[0].isdigit() and len(line) > 1 and line[1] in ['.', ')', '-']:
-                    line = line[2:].strip()
-                # Remove dash prefixes
-                if line.startswith('- '):
-                    line = line[2:].strip()
-                if line:
-                    cleaned_lines.append(line)
-            else:
-                cleaned_lines.append(line)
-        
-        return ' '.join(cleaned_lines).strip()
+        # Remove numbering (1., 2., etc.) and dash prefixes, dropping blank lines
+        lines = (_NUMBERING_RE.sub('', line.strip()).strip() for line in cleaned.split('\n'))
+        return ' '.join(line for line in lines if line)
     
     def _extract_text_from_html(self, html_content: str) -> str:
         """Extract clean text content from HTML, removing tags but preserving structure"""
-        import re
-        
         if not html_content:
             return ""
         
-        # Simple approach: just remove all HTML tags
-        text = re.sub(r'<[^>]+>', '', html_content)
-        
-        # Clean up extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        text = text.strip()
+        if HTMLParser is not None:
+            tree = HTMLParser(html_content)
+            node = tree.body or tree.root
+            text = node.text(separator=' ', strip=True) if node is not None else ''
+        else:
+            # Remove all HTML tags, then decode entities like &amp; so they don't reach the prompt
+            text = unescape(_TAG_RE.sub('', html_content))
         
-        return text
+        # Clean up extra whitespace (split() also drops leading/trailing runs)
+        return ' '.join(text.split())
     
     def debug_extract_text(self, html_content: str) -> str:
         """Debug method to see what text is being extracted from HTML"""
@@ -130,206 +309,358 @@ class LLMHelper:
         print("=== END TEST ===")
         return extracted
     
-    def _make_llm_call(self, prompt: str, max_tokens: int = None, temperature_override: float = None) -> str:
+    def _completion_kwargs(self, prompt: str, max_tokens: int = None, temperature_override: float = None, response_format: Dict[str, str] = None, system_prompt: str = None) -> Dict[str, Any]:
+        """Build the chat completion request shared by sync and async calls"""
+        max_tokens = max_tokens or self.MAX_TOKENS
+        if response_format is None:
+            prompt = f"{prompt}\n{self.TEXT_RESPONSE_INSTRUCTION}"
+            response_format = {"type": "json_object"}
+            max_tokens += self.TEXT_RESPONSE_TOKENS
+        
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            # Static instructions go first so repeated calls share a cacheable prefix
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        
+        return {
+            'model': self.MODEL,
+            'messages': messages,
+            'max_tokens': max_tokens,
+            'temperature': temperature_override if temperature_override is not None else self.TEMPERATURE,
+            'response_format': response_format
+        }
+    
+    def _response_text(self, response, raw: bool = False) -> str:
+        """Extract the text content of a chat completion response"""
+        content = response.choices[0].message.content
+        if content is None:
+            return ""
+        
+        # Structured (JSON) responses are parsed by the caller, so leave them untouched
+        if raw:
+            return content.strip()
+        
+        # Text replies arrive as {"text": ...}; a reply cut off mid-JSON has no usable text
+        if content.lstrip().startswith('{'):
+            try:
+                text = json.loads(content).get('text')
+            except (ValueError, AttributeError):
+                text = None
+            return text.strip() if isinstance(text, str) else ""
+        
+        # Fall back to cleaning quotes, numbering, etc. if the model ignored JSON mode
+        cleaned_content = self._clean_llm_response(content)
+        return cleaned_content if cleaned_content else ""
+    
+    def _cache_key(self, request: Dict[str, Any]) -> str:
+        """Key a completion request by everything that affects its response"""
+        return LLMResponseCache.make_key(request['model'], request['temperature'], request['max_tokens'], request['messages'], request['response_format'])
+    
+    def _make_llm_call(self, prompt: str, max_tokens: int = None, temperature_override: float = None, refresh: bool = False, response_format: Dict[str, str] = None, system_prompt: str = None, validate: Callable[[str], bool] = None) -> str:
         """Make a call to the LLM API with error handling and cleaning"""
         if not self.api_key or not self.client:
             return ""
 
+        request = self._completion_kwargs(prompt, max_tokens, temperature_override, response_format, system_prompt)
+        cache_key = self._cache_key(request)
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if validate is None or validate(cached):
+                    return cached
+                # Drop entries cached before validation existed so they're regenerated once
+                self.cache.delete(cache_key)
+
         try:
-            response = self.client.chat.completions.create(
-                model=self.MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens or self.MAX_TOKENS,
-                temperature=temperature_override if temperature_override is not None else self.TEMPERATURE
-            )
-            
-            # Clean the response to remove quotes, numbering, etc.
-            content = response.choices[0].message.content
-            if content is None:
-                return ""
-            
-            cleaned_content = self._clean_llm_response(content)
-            return cleaned_content if cleaned_content else ""
+            response = self.client.chat.completions.create(**request)
+            result = self._response_text(response, raw=response_format is not None)
             
         except Exception as e:
             print(f"Error making LLM call: {e}")
             return ""
+        
+        # Only cache usable responses, so a malformed or truncated reply isn't replayed
+        if result and self.cache is not None and (validate is None or validate(result)):
+            self.cache.set(cache_key, result)
+        return result
     
-    def generate_subject_line(self, content_summary: str = None) -> str:
-        """Generate subject line for the newsletter from a structured content summary"""
-        if not self.api_key:
-            return self.FALLBACK_SUBJECT_LINE
+    async def _amake_llm_call(self, prompt: str, max_tokens: int = None, temperature_override: float = None, refresh: bool = False, response_format: Dict[str, str] = None, system_prompt: str = None, validate: Callable[[str], bool] = None) -> str:
+        """Async variant of _make_llm_call so independent prompts can run concurrently"""
+        if not self.api_key or not self.async_client:
+            return ""
 
-        prompt = f"""
-        Write a subject line for a community tennis newsletter from Vamos Tennis in Belair and Dulwich, South East London.
+        request = self._completion_kwargs(prompt, max_tokens, temperature_override, response_format, system_prompt)
+        cache_key = self._cache_key(request)
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if validate is None or validate(cached):
+                    return cached
+                # Drop entries cached before validation existed so they're regenerated once
+                self.cache.delete(cache_key)
 
+        try:
+            response = await self.async_client.chat.completions.create(**request)
+            result = self._response_text(response, raw=response_format is not None)
+            
+        except Exception as e:
+            print(f"Error making LLM call: {e}")
+            return ""
+        
+        # Only cache usable responses, so a malformed or truncated reply isn't replayed
+        if result and self.cache is not None and (validate is None or validate(result)):
+            self.cache.set(cache_key, result)
+        return result
+    
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the helper's background event loop, starting it on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return self._loop
+    
+    def run_concurrently(self, *coroutines) -> List[Any]:
+        """Run coroutines concurrently and return their results in order"""
+        async def gather():
+            return await asyncio.gather(*coroutines)
+        
+        # A single long-lived loop keeps the async client's connections usable
+        # across calls and is safe to share between Streamlit sessions
+        return asyncio.run_coroutine_threadsafe(gather(), self._get_loop()).result()
+    
+    def _subject_line_prompt(self, content_summary: str = None) -> str:
+        """Build the subject line user message for a structured content summary"""
+        return f"""
         Newsletter contents:
         {content_summary}
 
-        Rules:
-        - Be specific to the actual content above — mention the real things on offer
-        - Tone: clear and direct, lightly warm — not hyped, not cheesy
-        - One emoji max, at the start
-        - No exclamation marks unless it's genuinely warranted
-        - Under 60 characters
-
-        Good examples (notice they reference real content, not vague phrases):
-        - 🎾 Adult courses & junior camps open for booking
-        - 📅 New courses + July tournament — book your spot
-        - 🎾 Beginner to Advanced: courses now open at Dulwich & Belair
-
-        Bad examples (too vague or cheesy — avoid these):
-        - Summer Tennis is Here — Courses, Camps & More
-        - Tennis in the sun? We've got you covered
-        - 🔥 What's New This Month
-
         Return only the subject line:
         """
 
-        return self._make_llm_call(prompt, max_tokens=60, temperature_override=0.4)
-    
-    def generate_preview_text(self, content_summary: str = None) -> str:
-        """Generate preview text for email from a structured content summary"""
+    def generate_subject_line(self, content_summary: str = None, refresh: bool = False) -> str:
+        """Generate subject line for the newsletter from a structured content summary"""
         if not self.api_key:
-            return self.FALLBACK_PREVIEW_TEXT
+            return self.FALLBACK_SUBJECT_LINE
 
-        prompt = f"""
-        Write a preview text (shown in email inboxes before opening) for a community tennis newsletter.
+        return self._make_llm_call(self._subject_line_prompt(content_summary), max_tokens=60, temperature_override=0.4, refresh=refresh, system_prompt=self.SUBJECT_LINE_SYSTEM_PROMPT)
+    
+    async def agenerate_subject_line(self, content_summary: str = None, refresh: bool = False) -> str:
+        """Async variant of generate_subject_line"""
+        if not self.api_key:
+            return self.FALLBACK_SUBJECT_LINE
 
+        return await self._amake_llm_call(self._subject_line_prompt(content_summary), max_tokens=60, temperature_override=0.4, refresh=refresh, system_prompt=self.SUBJECT_LINE_SYSTEM_PROMPT)
+    
+    def _preview_text_prompt(self, content_summary: str = None) -> str:
+        """Build the preview text user message for a structured content summary"""
+        return f"""
         Newsletter contents:
         {content_summary}
 
-        Rules:
-        - Under 150 characters
-        - Reference the actual content — don't be vague
-        - Only mention specific dates if they are present in the newsletter contents above — do not invent them
-        - Tone: conversational, like a quick heads-up from a friend
-        - No emoji
-        - No exclamation marks
-
-        Good examples:
-        - Adult and junior courses now open — plus a social doubles tournament on 19 July at Belair Park
-        - Beginner to Advanced courses at Dulwich and Belair, with junior camps starting next month
-
-        Bad examples (too vague):
-        - New courses and fun events this July
-        - Summer tennis is here — join a course, camp or tournament
-
         Return only the preview text:
         """
 
-        return self._make_llm_call(prompt, max_tokens=80, temperature_override=0.4)
+    def generate_preview_text(self, content_summary: str = None, refresh: bool = False) -> str:
+        """Generate preview text for email from a structured content summary"""
+        if not self.api_key:
+            return self.FALLBACK_PREVIEW_TEXT
+
+        return self._make_llm_call(self._preview_text_prompt(content_summary), max_tokens=80, temperature_override=0.4, refresh=refresh, system_prompt=self.PREVIEW_TEXT_SYSTEM_PROMPT)
+    
+    async def agenerate_preview_text(self, content_summary: str = None, refresh: bool = False) -> str:
+        """Async variant of generate_preview_text"""
+        if not self.api_key:
+            return self.FALLBACK_PREVIEW_TEXT
+
+        return await self._amake_llm_call(self._preview_text_prompt(content_summary), max_tokens=80, temperature_override=0.4, refresh=refresh, system_prompt=self.PREVIEW_TEXT_SYSTEM_PROMPT)
     
-    def generate_block_description(self, content_type: str) -> str:
+    def generate_block_description(self, content_type: str, refresh: bool = False) -> str:
         """Generate description for content blocks using LLM with fallback"""
         if not self.api_key:
             return self.FALLBACK_DESCRIPTIONS.get(content_type, "Join our tennis courses and improve your game!")
         
-        prompt = f"""
-        You are helping write short introductory summary text for sections in a community tennis newsletter.
-        
-        Each section includes a list of courses or camps (e.g. Adults or Juniors).  
+        if not refresh and self.cache is not None and content_type in self._block_desc_cache:
+            return self._block_desc_cache[content_type]
         
-        Your job is to write **1–2 warm, friendly lines** introducing what’s on offer, just before the bullet list.
-
-        Audience: casual adult players or parents of juniors  
-        Tone: inviting, clear, and upbeat — like a trusted local coach  
-        Do **not** start with an emoji.
-
+        prompt = f"""
         Here is the block: {content_type}
 
-        Write just the introductory paragraph that should go **above the bullet list**. Only mention specific dates or timing if they are clearly present in the provided content — do not invent them. Avoid sounding too salesy.
+        Write just the introductory paragraph that should go **above the bullet list**.
         """
         
-        result = self._make_llm_call(prompt)
+        result = self._make_llm_call(prompt, refresh=refresh, system_prompt=self.BLOCK_DESCRIPTION_SYSTEM_PROMPT)
+        if result and self.cache is not None:
+            self._block_desc_cache[content_type] = result
         return result
     
-    def generate_level_description(self, level: str) -> str:
+    def _level_description_prompt(self, level: str) -> str:
+        """Build the user message for a skill level description"""
+        return f"""
+        Generate a short, engaging description for a tennis skill level called "{level}".
+
+        Return only the description (no level name, no quotes):
+        """
+
+    def generate_level_description(self, level: str, refresh: bool = False) -> str:
         """Generate description for skill levels using LLM"""
         if not self.api_key:
             return self.FALLBACK_LEVEL_DESCRIPTIONS.get(level, "Suitable for all levels.")
         
-        prompt = f"""
-        Generate a short, engaging description for a tennis skill level called "{level}".
+        if not refresh and self.cache is not None and level in self._level_desc_cache:
+            return self._level_desc_cache[level]
         
-        Requirements:
-        - Keep under 100 characters
-        - Be encouraging and motivating
-        - Explain what this level is for
-        - Use natural, friendly tone
-        - No emojis
-        
-        Examples:
-        - Perfect for those new to tennis or returning after a break.
-        - For players who are confident rallying and ready to level up.
+        result = self._make_llm_call(self._level_description_prompt(level), max_tokens=50, refresh=refresh, system_prompt=self.LEVEL_DESCRIPTION_SYSTEM_PROMPT)
+        if result and self.cache is not None:
+            self._level_desc_cache[level] = result
+        return result
+    
+    async def agenerate_level_description(self, level: str, refresh: bool = False) -> str:
+        """Async variant of generate_level_description"""
+        if not self.api_key:
+            return self.FALLBACK_LEVEL_DESCRIPTIONS.get(level, "Suitable for all levels.")
         
-        Return only the description (no level name, no quotes):
-        """
+        if not refresh and self.cache is not None and level in self._level_desc_cache:
+            return self._level_desc_cache[level]
         
-        result = self._make_llm_call(prompt, max_tokens=50)
+        result = await self._amake_llm_call(self._level_description_prompt(level), max_tokens=50, refresh=refresh, system_prompt=self.LEVEL_DESCRIPTION_SYSTEM_PROMPT)
+        if result and self.cache is not None:
+            self._level_desc_cache[level] = result
         return result
+    
+    def generate_level_descriptions(self, levels: List[str], refresh: bool = False) -> Dict[str, str]:
+        """Generate descriptions for several skill levels concurrently"""
+        results = self.run_concurrently(*[self.agenerate_level_description(level, refresh=refresh) for level in levels])
+        return dict(zip(levels, results))
 
-    def generate_event_description(self, event_info: Dict[str, Any]) -> str:
-        """Generate event description using LLM or fallback"""
+    def _event_description_prompt(self, event_info: Dict[str, Any]) -> str:
+        """Build the user message for rewriting a user supplied event description"""
         user_description = event_info.get('description', '')
         user_title = event_info.get('title', 'Event')
-
-        if not self.api_key:
-            return self.FALLBACK_EVENT_DESCRIPTION.get(event_info.get('title', 'Event'))
         
-        prompt = f"""
-            You are writing a short, friendly description for a block to be included in a community tennis newsletter.
-
+        return f"""
             User provided this event description: {user_description}
 
             User provided this event title: {user_title}
 
-            Keep the key details but make it sound more inviting and natural.
-
-            Style: max 3 sentences
-            Include: a short summary of the vibe or activity (e.g. social doubles, holiday camps, drop-ins)
-            Only mention date, time, and location if they are explicitly provided above — do not invent or assume them.
-            Do not mention a venue name unless it is explicitly stated in the event info above.
-            Audience: adult recreational tennis players and parents of junior players in South London
-            Tone: warm, clear, and lightly enthusiastic (not too salesy or overhyped). Limited emojis in the description
-
-            Example (only if date/location were provided in the input):
-            - Join us for a fun adult doubles tournament. Whether you're coming solo or with a partner, it's a great way to meet other players and enjoy some friendly matchplay in the sun.
-
             Return only the rewritten event description:
             """
-            
-        return self._make_llm_call(prompt, max_tokens=150)
+
+    def _event_cache_key(self, event_info: Dict[str, Any]) -> tuple:
+        """Key an event on its title and description"""
+        return (event_info.get('title', 'Event'), hash(event_info.get('description', '')))
+
+    def generate_event_description(self, event_info: Dict[str, Any], refresh: bool = False) -> str:
+        """Generate event description using LLM or fallback"""
+        if not self.api_key:
+            return self.FALLBACK_EVENT_DESCRIPTIONS.get(event_info.get('title', 'Event'), self.FALLBACK_EVENT_DESCRIPTIONS['default'])
+        
+        key = self._event_cache_key(event_info)
+        if not refresh and self.cache is not None and key in self._event_desc_cache:
+            return self._event_desc_cache[key]
+        
+        result = self._make_llm_call(self._event_description_prompt(event_info), max_tokens=150, refresh=refresh, system_prompt=self.EVENT_DESCRIPTION_SYSTEM_PROMPT)
+        if result and self.cache is not None:
+            self._event_desc_cache[key] = result
+        return result
+    
+    async def agenerate_event_description(self, event_info: Dict[str, Any], refresh: bool = False) -> str:
+        """Async variant of generate_event_description for generating several events at once"""
+        if not self.api_key:
+            return self.generate_event_description(event_info)
+        
+        key = self._event_cache_key(event_info)
+        if not refresh and self.cache is not None and key in self._event_desc_cache:
+            return self._event_desc_cache[key]
+        
+        result = await self._amake_llm_call(self._event_description_prompt(event_info), max_tokens=150, refresh=refresh, system_prompt=self.EVENT_DESCRIPTION_SYSTEM_PROMPT)
+        if result and self.cache is not None:
+            self._event_desc_cache[key] = result
+        return result
         
     
-    def generate_newsletter_summary(self, content_summary: str = None) -> str:
+    def _newsletter_summary_prompt(self, content_summary: str = None) -> str:
+        """Build the intro paragraph user message for a structured content summary"""
+        return f"""
+        Newsletter contents:
+        {content_summary}
+
+        Return only the intro paragraph:
+        """
+
+    def generate_newsletter_summary(self, content_summary: str = None, refresh: bool = False) -> str:
         """Generate newsletter intro paragraph from a structured content summary"""
         if not self.api_key:
             return self.FALLBACK_NEWSLETTER_SUMMARY
 
-        prompt = f"""
-        Write a short intro paragraph (1–2 sentences) for a community tennis newsletter from Vamos Tennis in South London.
+        return self._make_llm_call(self._newsletter_summary_prompt(content_summary), max_tokens=120, temperature_override=0.4, refresh=refresh, system_prompt=self.NEWSLETTER_SUMMARY_SYSTEM_PROMPT)
+    
+    async def agenerate_newsletter_summary(self, content_summary: str = None, refresh: bool = False) -> str:
+        """Async variant of generate_newsletter_summary"""
+        if not self.api_key:
+            return self.FALLBACK_NEWSLETTER_SUMMARY
+
+        return await self._amake_llm_call(self._newsletter_summary_prompt(content_summary), max_tokens=120, temperature_override=0.4, refresh=refresh, system_prompt=self.NEWSLETTER_SUMMARY_SYSTEM_PROMPT)
 
+    def _newsletter_meta_prompt(self, content_summary: str = None) -> str:
+        """Build the user message asking for subject, preview text and intro paragraph as JSON"""
+        return f"""
         Newsletter contents:
         {content_summary}
 
-        Rules:
-        - Name the specific things on offer — don't be vague
-        - Tone: like a friendly coach giving a quick roundup, not a marketing email
-        - If there's a named event (e.g. a tournament or camp), mention it by name
-        - Only mention specific dates if they are present in the newsletter contents above — do not invent them
-        - One emoji is fine, but not at the very start
-        - No exclamation marks
-
-        Good examples:
-        - Courses are back across Dulwich and Belair this month, with sessions from Beginner to Advanced — plus a social doubles tournament on 19 July.
-        - We've got adult courses starting this week and junior holiday camps running every Saturday from late July. There's also a social tournament coming up if you fancy some match play.
-
-        Bad examples:
-        - Summer tennis is here — join a course, camp or tournament
-        - Check out what's coming up this month — from new tennis courses to help you improve your game
-
-        Return only the intro paragraph:
+        Return a JSON object with exactly the keys "subject", "preview" and "summary".
         """
 
-        return self._make_llm_call(prompt, max_tokens=120, temperature_override=0.4)
+    def _parse_newsletter_meta(self, content: str) -> Dict[str, str]:
+        """Parse the JSON meta response, returning None if any field is unusable"""
+        try:
+            data = json.loads(content)
+        except (TypeError, ValueError):
+            return None
+
+        if not isinstance(data, dict):
+            return None
+
+        meta = {}
+        for field in ('subject', 'preview', 'summary'):
+            value = data.get(field)
+            if not isinstance(value, str) or not value.strip():
+                return None
+            meta[field] = value.strip()
+        return meta
+
+    def generate_newsletter_meta(self, content_summary: str = None, refresh: bool = False) -> Dict[str, str]:
+        """Generate subject line, preview text and intro paragraph in one JSON completion"""
+        if not self.api_key:
+            return {
+                'subject': self.FALLBACK_SUBJECT_LINE,
+                'preview': self.FALLBACK_PREVIEW_TEXT,
+                'summary': self.FALLBACK_NEWSLETTER_SUMMARY
+            }
+
+        content = self._make_llm_call(
+            self._newsletter_meta_prompt(content_summary),
+            max_tokens=300,
+            temperature_override=0.4,
+            refresh=refresh,
+            response_format={"type": "json_object"},
+            system_prompt=self.NEWSLETTER_META_SYSTEM_PROMPT,
+            validate=lambda content: self._parse_newsletter_meta(content) is not None
+        )
+        meta = self._parse_newsletter_meta(content)
+        if meta:
+            return meta
+
+        # Fall back to one prompt per field if the combined response couldn't be parsed
+        print("Could not parse newsletter meta JSON, falling back to individual calls")
+        subject, preview, summary = self.run_concurrently(
+            self.agenerate_subject_line(content_summary=content_summary, refresh=refresh),
+            self.agenerate_preview_text(content_summary=content_summary, refresh=refresh),
+            self.agenerate_newsletter_summary(content_summary=content_summary, refresh=refresh)
+        )
+        return {'subject': subject, 'preview': preview, 'summary': summary}
+
+    def generate_newsletter_metadata_from_html(self, html_content: str, refresh: bool = False) -> Dict[str, str]:
+        """Generate subject line, preview text and intro paragraph for built newsletter HTML"""
+        # Extract the text once and share it across all three fields in a single request
+        return self.generate_newsletter_meta(self._extract_text_from_html(html_content), refresh=refresh)
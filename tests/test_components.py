@@ -3,19 +3,23 @@
 Test script for HTML Generator and LLM Helper components
 """
 
+import io
 import pandas as pd
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if __name__ == "__main__":
+    # Run directly as a script; under pytest, conftest.py puts the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from csv_processor import CSVProcessor
-from html_generator import HTMLGenerator
-from llm_helper import LLMHelper
 
 def load_real_csv():
     """Load the real coaching export CSV file"""
     try:
-        df = pd.read_csv('../coaching-export-22-July-2025-10_55.csv')
+        # Read only the columns CSVProcessor uses, as text, the same way the app loads uploads
+        processor = CSVProcessor()
+        df = pd.read_csv('../coaching-export-22-July-2025-10_55.csv', usecols=processor.required_columns, dtype=processor.column_dtypes)
         print(f"✅ Loaded CSV with {len(df)} rows and columns: {list(df.columns)}")
         return df
     except FileNotFoundError:
@@ -45,7 +49,8 @@ def create_sample_data():
         'Active Participants': [8, 9, 6, 7, 4, 12]
     }
     
-    return pd.DataFrame(sample_data)
+    # Low-cardinality columns as categories, the dtype _clean_data gives them
+    return pd.DataFrame(sample_data).astype({'Status': 'category', 'Type': 'category', 'Day': 'category'})
 
 def test_csv_processor():
     """Test CSV processor functionality"""
@@ -68,15 +73,55 @@ def test_csv_processor():
     
     # Show some sample data
     print(f"   Sample courses:")
-    for i, row in processed_df.head(3).iterrows():
-        print(f"     - {row['Name']} ({row['Skill Level']}) at {row['Venue']}")
+    for name, skill_level, venue in processed_df.head(3)[['Name', 'Skill Level', 'Venue']].itertuples(index=False, name=None):
+        print(f"     - {name} ({skill_level}) at {venue}")
     
     return processed_df
 
+def test_csv_processor_irregular_rows():
+    """Test that multi-line quoted names and short rows parse like pandas does"""
+    print("\n🧪 Testing CSV Processor with irregular rows...")
+    
+    header = "Name,Status,Start Date,Time,Type,Day,Classes,Active Participants,Notes\n"
+    row = "Belair Park Adult Beginner Course,Upcoming,04/08/2025,18:00,Adult,Monday,6,8,x\n"
+    multi_line = '"Dulwich Park Adult\nImprover Course",Upcoming,11/08/2025,19:00,Adult,Tuesday,6,9,x\n'
+    short_row = "Belair Park Adult Intermediate Course,Upcoming,18/08/2025,20:00,Adult,Wednesday,6,7\n"
+    
+    # Open the quoted name just before pyarrow's 1 MiB read block boundary so the boundary falls inside it
+    filler_rows = (1 << 20) // len(row) - 2
+    prefix = header + row * filler_rows
+    prefix += row[:-2] + 'x' * ((1 << 20) - 10 - len(prefix) - len(row)) + '\n'
+    csv_bytes = (prefix + multi_line + row + short_row).encode('utf-8')
+    
+    processed_df = CSVProcessor().process_csv(io.BytesIO(csv_bytes))
+    
+    assert len(processed_df) == filler_rows + 4
+    assert 'Dulwich Park Adult\nImprover Course' in set(processed_df['Name'])
+    assert processed_df['Skill Level'].iloc[-1] == 'Intermediate'
+    print(f"✅ Parsed {len(processed_df)} rows including a multi-line name and a short row")
+
+def test_csv_processor_label_priority():
+    """Test that names mentioning several venues or levels use the first pattern listed"""
+    print("\n🧪 Testing CSV Processor label priority...")
+    
+    processor = CSVProcessor()
+    names = pd.Series(['Intermediate Dulwich & Belair', 'Advanced to Beginner Belair', 'Social Doubles'])
+    
+    venues = processor._extract_label(names, processor.venue_patterns, 'Unknown Venue')
+    skill_levels = processor._extract_label(names, processor.skill_levels, 'Unknown')
+    
+    assert list(venues) == ['Belair Park', 'Belair Park', 'Unknown Venue']
+    assert list(skill_levels) == ['Intermediate', 'Beginner', 'Unknown']
+    print("✅ Venue and skill level follow pattern priority")
+
 def test_html_generator(df):
     """Test HTML generator functionality"""
     print("\n🧪 Testing HTML Generator...")
     
+    # Imported here so the CSV checks don't pay for loading the OpenAI client
+    from html_generator import HTMLGenerator
+    from llm_helper import LLMHelper
+    
     # Test without LLM (deterministic)
     generator = HTMLGenerator()
     processor = CSVProcessor()
@@ -116,6 +161,8 @@ def test_llm_helper():
     """Test LLM helper functionality"""
     print("\n🧪 Testing LLM Helper...")
     
+    from llm_helper import LLMHelper
+    
     helper = LLMHelper()  # Will use fallback if no API key
     
     # Test subject lines
@@ -146,6 +193,8 @@ def main():
     
     # Test CSV processor
     df = test_csv_processor()
+    test_csv_processor_irregular_rows()
+    test_csv_processor_label_priority()
     
     # Test HTML generator
     newsletter_html = test_html_generator(df)
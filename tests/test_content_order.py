@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for reordering newsletter content from the Step 2 position inputs
+"""
+
+import sys
+import os
+
+if __name__ == "__main__":
+    # Run directly as a script; under pytest, conftest.py puts the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st
+
+from app import apply_content_order, reorder_content
+
+def test_move_last_to_first():
+    """Test that the last item can be moved straight to the top"""
+    print("🧪 Testing move to first position...")
+
+    assert reorder_content(['adults', 'juniors', 'event_1'], [1, 2, 1]) == ['event_1', 'adults', 'juniors']
+    print("✅ Last item moved to the top")
+
+def test_swap_adjacent():
+    """Test that moving either of two neighbours swaps them"""
+    print("\n🧪 Testing adjacent swaps...")
+
+    order = ['adults', 'juniors', 'event_1']
+    assert reorder_content(order, [1, 1, 3]) == ['juniors', 'adults', 'event_1']
+    assert reorder_content(order, [2, 2, 3]) == ['juniors', 'adults', 'event_1']
+    assert reorder_content(order, [2, 1, 3]) == ['juniors', 'adults', 'event_1']
+    print("✅ Adjacent items swapped")
+
+def test_unchanged_and_out_of_range():
+    """Test that untouched positions keep the order and large positions move to the end"""
+    print("\n🧪 Testing unchanged and out of range positions...")
+
+    order = ['adults', 'juniors', 'event_1']
+    assert reorder_content(order, [1, 2, 3]) == order
+    assert reorder_content(order, [9, 2, 3]) == ['juniors', 'event_1', 'adults']
+    print("✅ Unchanged order kept and large positions appended")
+
+def test_apply_clears_inputs():
+    """Test that applying the form reorders content and clears the position inputs"""
+    print("\n🧪 Testing apply_content_order...")
+
+    order = ['adults', 'juniors', 'event_1']
+    st.session_state['position_2_event_1'] = 1
+    apply_content_order(order)
+
+    assert st.session_state.content_order == ['event_1', 'adults', 'juniors']
+    assert not any(key.startswith('position_') for key in st.session_state)
+    print("✅ Content reordered and inputs cleared")
+
+def main():
+    """Run all tests"""
+    print("🚀 Testing Content Ordering\n")
+
+    test_move_last_to_first()
+    test_swap_adjacent()
+    test_unchanged_and_out_of_range()
+    test_apply_clears_inputs()
+
+    print("\n✅ All content order tests completed successfully!")
+
+if __name__ == "__main__":
+    main()
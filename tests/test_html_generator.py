@@ -6,7 +6,10 @@ Test script to generate HTML preview using HTMLGenerator
 import pandas as pd
 import sys
 import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if __name__ == "__main__":
+    # Run directly as a script; under pytest, conftest.py puts the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from html_generator import HTMLGenerator
 from llm_helper import LLMHelper
@@ -17,10 +20,10 @@ def load_real_data():
     csv_file = "../coaching-export.csv"  # This is the correct filename
     
     try:
-        # Load the CSV file using CSVProcessor
+        # Load the CSV file using CSVProcessor, in chunks so large exports stay bounded in memory
         processor = CSVProcessor()
         with open(csv_file, 'r') as f:
-            processed_df = processor.process_csv(f)
+            processed_df = processor.process_csv(f, chunksize=50_000)
         
         print(f"📊 Loaded and processed {len(processed_df)} courses from {csv_file}")
         return processed_df
@@ -44,7 +47,8 @@ def create_sample_data():
         'Type': ['adult', 'adult', 'adult', 'adult', 'adult'],
         'Active Participants': [5, 8, 12, 6, 9]
     }
-    return pd.DataFrame(data)
+    # Match CSVProcessor's output, where these low-cardinality columns are categorical
+    return pd.DataFrame(data).astype({'Venue': 'category', 'Skill Level': 'category', 'Type': 'category'})
 
 def main():
     """Generate HTML preview"""
@@ -54,6 +58,12 @@ def main():
     courses_df = load_real_data()
     print(f"📊 Data loaded with {len(courses_df)} courses")
     
+    # Lowercase Type once and reuse the masks below instead of rescanning the column
+    course_types = courses_df['Type'].str.lower()
+    is_adult = course_types.eq('adult')
+    is_junior = course_types.eq('junior')
+    is_event = course_types.str.contains('event', na=False)
+    
     # Initialize components
     # Option 1: Use environment variable (recommended)
     # export OPENAI_API_KEY='your-api-key-here'
@@ -67,29 +77,31 @@ def main():
     # Show data summary
     print(f"\n📋 Data Summary:")
     print(f"   Total courses: {len(courses_df)}")
-    print(f"   Adult courses: {len(courses_df[courses_df['Type'].str.lower() == 'adult'])}")
-    print(f"   Junior courses: {len(courses_df[courses_df['Type'].str.lower() == 'junior'])}")
+    print(f"   Adult courses: {int(is_adult.sum())}")
+    print(f"   Junior courses: {int(is_junior.sum())}")
     print(f"   Skill levels: {courses_df['Skill Level'].unique()}")
     print(f"   Venues: {courses_df['Venue'].unique()}")
     print(f"   Course types: {courses_df['Type'].unique()}")
     print(f"   Sample course data:")
     if len(courses_df) > 0:
-        print(f"     First course: {courses_df.iloc[0].to_dict()}")
+        # Read one cell per column rather than materialising the whole row as a Series
+        first_course = ', '.join(f"{column}: {courses_df[column].iat[0]}" for column in courses_df.columns)
+        print(f"     First course: {first_course}")
     
     # Generate adult courses block
-    adult_courses = courses_df[courses_df['Type'].str.lower() == 'adult']
+    adult_courses = courses_df[is_adult]
     print(f"   Adult courses found: {len(adult_courses)}")
     adult_html = html_generator.generate_course_block(adult_courses, 'adults')
     print(f"   Adult HTML length: {len(adult_html) if adult_html else 0}")
     
     # Generate junior courses block (empty for this sample)
-    junior_courses = courses_df[courses_df['Type'].str.lower() == 'junior']
+    junior_courses = courses_df[is_junior]
     print(f"   Junior courses found: {len(junior_courses)}")
     junior_html = html_generator.generate_course_block(junior_courses, 'juniors')
     print(f"   Junior HTML length: {len(junior_html) if junior_html else 0}")
     
     # Generate events block
-    event_courses = courses_df[courses_df['Type'].str.contains('event', na=False)]
+    event_courses = courses_df[is_event]
     print(f"   Event courses found: {len(event_courses)}")
     events_html = html_generator.generate_events_block(event_courses)
     print(f"   Events HTML length: {len(events_html) if events_html else 0}")
@@ -107,21 +119,16 @@ def main():
     print(f"Generated description: {event_description}")
     
     # Combine all blocks
-    blocks = []
-    if adult_html:
-        blocks.append(adult_html)
-    if junior_html:
-        blocks.append(junior_html)
-    if events_html:
-        blocks.append(events_html)
+    blocks = [block for block in (adult_html, junior_html, events_html) if block]
     
     # Generate complete newsletter
     newsletter_html = html_generator.generate_newsletter_html(blocks, "🎾 New Tennis Courses Available!", llm_helper)
     
     # Save to file
     output_file = "newsletter_preview.html"
-    with open(output_file, 'w') as f:
-        f.write(newsletter_html)
+    # Encode once as UTF-8 rather than relying on the platform's default text encoding
+    with open(output_file, 'wb') as f:
+        f.write(newsletter_html.encode('utf-8'))
     
     print(f"✅ HTML generated and saved to: {output_file}")
     print("📄 Open the file in your browser to preview")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk LLM response cache
+"""
+
+import os
+import sys
+import json
+import tempfile
+import types
+from unittest import mock
+
+if __name__ == "__main__":
+    # Run directly as a script; under pytest, conftest.py puts the repo root on the path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import LLMResponseCache
+from llm_helper import LLMHelper
+
+def test_round_trip_and_atomic_write():
+    """Test that entries are written as whole JSON files and read back from disk"""
+    print("🧪 Testing LLM cache write and read...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir=cache_dir)
+        key = LLMResponseCache.make_key('gpt-4o', 0.7, 150, 'prompt')
+    
+        with mock.patch('llm_cache.time.time', return_value=1000.0):
+            cache.set(key, 'Hello there')
+    
+        # Only the final entry is left behind, with no temp files from the atomic replace
+        assert os.listdir(cache_dir) == [f"{key}.json"]
+        with open(os.path.join(cache_dir, f"{key}.json"), encoding='utf-8') as f:
+            assert json.load(f) == {'response': 'Hello there', 'created': 1000.0}
+    
+        # A fresh instance has an empty memory layer, so this reads from disk
+        with mock.patch('llm_cache.time.time', return_value=1001.0):
+            assert LLMResponseCache(cache_dir=cache_dir).get(key) == 'Hello there'
+    
+    print("✅ Round trip and atomic write work")
+
+def test_memory_layer():
+    """Test that repeat hits are served from memory without touching disk"""
+    print("\n🧪 Testing LLM cache memory layer...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir=cache_dir)
+        key = LLMResponseCache.make_key('memory')
+        cache.set(key, 'Cached')
+        os.remove(os.path.join(cache_dir, f"{key}.json"))
+    
+        assert cache.get(key) == 'Cached'
+        assert LLMResponseCache(cache_dir=cache_dir).get(key) is None
+    
+    print("✅ Memory layer serves repeat hits")
+
+def test_ttl_expiry():
+    """Test that entries older than the TTL are misses, in memory and on disk"""
+    print("\n🧪 Testing LLM cache expiry...")
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = LLMResponseCache(cache_dir=cache_dir, ttl_seconds=60)
+        key = LLMResponseCache.make_key('ttl')
+    
+        with mock.patch('llm_cache.time.time', return_value=1000.0):
+            cache.set(key, 'Fresh')
+    
+        with mock.patch('llm_cache.time.time', return_value=1060.0):
+            assert cache.get(key) == 'Fresh'
+            assert LLMResponseCache(cache_dir=cache_dir, ttl_seconds=60).get(key) == 'Fresh'
+    
+        with mock.patch('llm_cache.time.time', return_value=1061.0):
+            assert cache.get(key) is None
+            assert LLMResponseCache(cache_dir=cache_dir, ttl_seconds=60).get(key) is None
+    
+    print("✅ Expired entries are ignored")
+
+def test_refresh_bypasses_cache():
+    """Test that LLMHelper serves cached replies unless refresh is requested"""
+    print("\n🧪 Testing LLM cache refresh...")
+    
+    replies = iter(['{"text": "First"}', '{"text": "Second"}'])
+    calls = []
+    
+    def create(**request):
+        calls.append(request)
+        message = types.SimpleNamespace(content=next(replies))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        helper = LLMHelper(api_key='sk-test')
+        helper.cache = LLMResponseCache(cache_dir=cache_dir)
+        helper.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=types.SimpleNamespace(create=create)))
+    
+        assert helper._make_llm_call('Say hello') == 'First'
+        assert helper._make_llm_call('Say hello') == 'First'
+        assert len(calls) == 1
+    
+        # Refresh calls the API again and replaces the cached reply
+        assert helper._make_llm_call('Say hello', refresh=True) == 'Second'
+        assert helper._make_llm_call('Say hello') == 'Second'
+        assert len(calls) == 2
+    
+    print("✅ Refresh bypasses and updates the cache")
+
+def main():
+    """Run all tests"""
+    print("🚀 Testing LLM Response Cache\n")
+    
+    test_round_trip_and_atomic_write()
+    test_memory_layer()
+    test_ttl_expiry()
+    test_refresh_bypasses_cache()
+    
+    print("\n✅ All cache tests completed successfully!")
+
+if __name__ == "__main__":
+    main()
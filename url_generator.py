@@ -1,34 +1,44 @@
-from datetime import datetime, timedelta
-from urllib.parse import quote
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Tuple
+
+def _format_date(day: date) -> str:
+    """Format a date as YYYY/MM/DD; only digits and slashes, so it needs no URL encoding"""
+    return f"{day.year:04d}/{day.month:02d}/{day.day:02d}"
+
+@lru_cache(maxsize=2)
+def _date_range(today_iso: str) -> Tuple[str, str]:
+    """Return the (start, end) filter dates for 6 weeks from a day; keyed on the date so it rolls over at midnight"""
+    today = date.fromisoformat(today_iso)
+    end_date = today + timedelta(weeks=6)
+    return _format_date(today), _format_date(end_date)
 
 class ClubSparkURLGenerator:
     """Generates ClubSpark URLs for 6 weeks from today"""
     
-    def __init__(self):
-        self.base_url = "https://clubspark.lta.org.uk/VamosTennis/Admin/Coaching/CoachingReports"
+    BASE_URL = "https://clubspark.lta.org.uk/VamosTennis/Admin/Coaching/CoachingReports"
+    QUERY_TEMPLATE = "?startdateforfiltering=%s&enddateforfiltering=%s&category=&status=Upcoming&leadcoachforfiltering=&venue="
+    
+    # Full report URLs with only the two dates left to fill in
+    COURSES_URL_TEMPLATE = f"{BASE_URL}/Coaching_Courses{QUERY_TEMPLATE}"
+    SESSIONS_URL_TEMPLATE = f"{BASE_URL}/Coaching_Sessions{QUERY_TEMPLATE}"
+    
+    def _build(self, url_template: str, today_iso: str = None) -> str:
+        """Fill a report URL template with the next 6 weeks of dates"""
+        return url_template % _date_range(today_iso or date.today().isoformat())
+    
+    def get_urls(self) -> Dict[str, str]:
+        """Generate both report URLs for the same day"""
+        today_iso = date.today().isoformat()
+        return {
+            'courses': self._build(self.COURSES_URL_TEMPLATE, today_iso),
+            'sessions': self._build(self.SESSIONS_URL_TEMPLATE, today_iso)
+        }
     
     def get_courses_url(self) -> str:
         """Generate ClubSpark courses URL for next 6 weeks"""
-        today = datetime.now()
-        end_date = today + timedelta(weeks=6)
-        
-        start_str = today.strftime("%Y/%m/%d")
-        end_str = end_date.strftime("%Y/%m/%d")
-        
-        start_encoded = quote(start_str)
-        end_encoded = quote(end_str)
-        
-        return f"{self.base_url}/Coaching_Courses?startdateforfiltering={start_encoded}&enddateforfiltering={end_encoded}&category=&status=Upcoming&leadcoachforfiltering=&venue="
+        return self._build(self.COURSES_URL_TEMPLATE)
     
     def get_sessions_url(self) -> str:
         """Generate ClubSpark sessions URL for next 6 weeks"""
-        today = datetime.now()
-        end_date = today + timedelta(weeks=6)
-        
-        start_str = today.strftime("%Y/%m/%d")
-        end_str = end_date.strftime("%Y/%m/%d")
-        
-        start_encoded = quote(start_str)
-        end_encoded = quote(end_str)
-        
-        return f"{self.base_url}/Coaching_Sessions?startdateforfiltering={start_encoded}&enddateforfiltering={end_encoded}&category=&status=Upcoming&leadcoachforfiltering=&venue=" 
\ No newline at end of file
+        return self._build(self.SESSIONS_URL_TEMPLATE)